@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot paths of the Python scripts on synthetic census data.
+
+Measures throughput (items per second, best of --repeat runs) and peak Python
+memory (tracemalloc, measured in a separate run so it does not skew timing) for:
+
+- extract_json_from_markdown   (items: model response texts)
+- convert_file                 (items: Gemini JSONL lines, end to end)
+- get_substrate_fingerprint    (items: substrates)
+- extract_substrate_occurrences (items: photo documents)
+- cli_startup                  (items: `typeface_tools.py dedupe --help` runs;
+                                fixed count, independent of --scale)
+
+Inputs come from synthetic_data.py and every item is distinct at every scale.
+convert_file reads a temp file the records are streamed to before timing. The
+in-process benchmarks generate their input CHUNK_SIZE items at a time with the
+clock stopped, so the generator stays out of the timings and memory stays
+bounded; the peak memory figure includes one chunk of input. Each timed run
+uses a fresh TextNormalizer, so no run starts with a warm cache.
+
+Results are compared against benchmarks/baseline.json. Baselines are machine
+specific: re-record one with --save-baseline before comparing on a new machine.
+
+Usage:
+    python benchmarks/run_benchmarks.py --scale 10k
+    python benchmarks/run_benchmarks.py --scale 100k --only convert_file
+    python benchmarks/run_benchmarks.py --scale 10k --save-baseline
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCHMARKS_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+sys.path.insert(0, str(BENCHMARKS_DIR))
+
+from convert_gemini_to_chatgpt import convert_file, extract_json_from_markdown  # noqa: E402
+from find_duplicate_texts import extract_substrate_occurrences, get_substrate_fingerprint  # noqa: E402
+from synthetic_data import gemini_records, photo_documents  # noqa: E402
+from text_normalization import TextNormalizer  # noqa: E402
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+CHUNK_SIZE = 100
+STARTUP_RUNS = 20
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+
+
+class _Stopwatch:
+    """Accumulates the time between start() and stop() calls."""
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+
+    def stop(self):
+        self.elapsed += time.perf_counter() - self._started
+
+
+def _untimed_chunks(items, stopwatch):
+    """Yield from items, pulling each CHUNK_SIZE batch with the stopwatch stopped."""
+    items = iter(items)
+    while True:
+        stopwatch.stop()
+        chunk = list(itertools.islice(items, CHUNK_SIZE))
+        stopwatch.start()
+        if not chunk:
+            return
+        yield from chunk
+
+
+def _copy_sets(n):
+    """Yield the copy texts of the first n substrates in photo_documents."""
+    count = 0
+    for photo in photo_documents(n):
+        for substrate in photo["substrates"]:
+            yield [t["copy"] for t in substrate["typefaces"] if t.get("copy") is not None]
+            count += 1
+            if count == n:
+                return
+
+
+@contextlib.contextmanager
+def _quiet():
+    with open(os.devnull, "w") as devnull, \
+         contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        yield
+
+
+def bench_extract_json_from_markdown(n, workdir):
+    def run():
+        stopwatch = _Stopwatch()
+        stopwatch.start()
+        texts = (
+            record["response"]["candidates"][0]["content"]["parts"][0]["text"]
+            for record in gemini_records(n)
+        )
+        for text in _untimed_chunks(texts, stopwatch):
+            extract_json_from_markdown(text)
+        stopwatch.stop()
+        return stopwatch.elapsed
+    return run
+
+
+def bench_convert_file(n, workdir):
+    input_path = Path(workdir) / "gemini.jsonl"
+    output_path = Path(workdir) / "gemini_chatgpt.jsonl"
+    with open(input_path, "w", encoding="utf-8") as f:
+        for record in gemini_records(n):
+            f.write(json.dumps(record) + "\n")
+
+    def run():
+        with _quiet():
+            convert_file(input_path, output_path)
+    return run
+
+
+def bench_get_substrate_fingerprint(n, workdir):
+    def run():
+        stopwatch = _Stopwatch()
+        stopwatch.start()
+        normalizer = TextNormalizer()
+        for copy_texts in _untimed_chunks(_copy_sets(n), stopwatch):
+            get_substrate_fingerprint(copy_texts, normalizer=normalizer)
+        stopwatch.stop()
+        return stopwatch.elapsed
+    return run
+
+
+def bench_extract_substrate_occurrences(n, workdir):
+    def run():
+        stopwatch = _Stopwatch()
+        stopwatch.start()
+        extract_substrate_occurrences(_untimed_chunks(photo_documents(n), stopwatch), normalizer=TextNormalizer())
+        stopwatch.stop()
+        return stopwatch.elapsed
+    return run
+
+
+def bench_cli_startup(n, workdir):
+    command = [sys.executable, str(PROJECT_ROOT / "scripts" / "typeface_tools.py"), "dedupe", "--help"]
+
+    def run():
+        for _ in range(STARTUP_RUNS):
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    # Time is spent in child processes, which tracemalloc cannot see
+    run.items = STARTUP_RUNS
+    run.traces_memory = False
+    return run
+
+
+BENCHMARKS = {
+    "extract_json_from_markdown": bench_extract_json_from_markdown,
+    "convert_file": bench_convert_file,
+    "get_substrate_fingerprint": bench_get_substrate_fingerprint,
+    "extract_substrate_occurrences": bench_extract_substrate_occurrences,
+    "cli_startup": bench_cli_startup,
+}
+
+
+def run_benchmark(name, n, repeat=3, measure_memory=True):
+    """Run one benchmark; returns {"items", "seconds", "items_per_second", "peak_bytes"}."""
+    with tempfile.TemporaryDirectory(prefix="typeface_bench_") as workdir:
+        run = BENCHMARKS[name](n, workdir)
+        n = getattr(run, "items", n)
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            # Runs that keep input generation out of the timing return their own time
+            elapsed = run()
+            if elapsed is None:
+                elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        peak = None
+        if measure_memory and getattr(run, "traces_memory", True):
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return {
+        "items": n,
+        "seconds": round(best, 4),
+        "items_per_second": round(n / best, 1) if best else None,
+        "peak_bytes": peak,
+    }
+
+
+def load_baseline(path):
+    if not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def compare(key, result, baseline, threshold):
+    """Return (summary, regressed) for one result against its baseline entry."""
+    base = baseline.get(key)
+    if not base:
+        return "no baseline", False
+    parts = []
+    regressed = False
+    if base.get("items_per_second") and result["items_per_second"]:
+        change = result["items_per_second"] / base["items_per_second"] - 1
+        parts.append(f"throughput {change:+.1%}")
+        regressed |= change < -threshold
+    if base.get("peak_bytes") and result["peak_bytes"]:
+        change = result["peak_bytes"] / base["peak_bytes"] - 1
+        parts.append(f"peak {change:+.1%}")
+        regressed |= change > threshold
+    return ", ".join(parts), regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Python scripts on synthetic census data",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k", help="Number of items (default: 10k)")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="Run only this benchmark (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark; the best is kept (default: 3)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak memory run")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results in the baseline file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative change counted as a regression (default: 0.10)",
+    )
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    args = parser.parse_args()
+
+    n = SCALES[args.scale]
+    names = args.only or list(BENCHMARKS)
+    baseline = load_baseline(args.baseline)
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<36} {'items/s':>12} {'peak MB':>9}  vs baseline")
+    for name in names:
+        key = f"{name}@{args.scale}"
+        result = run_benchmark(name, n, repeat=max(1, args.repeat), measure_memory=not args.no_memory)
+        results[key] = result
+        summary, regressed = compare(key, result, baseline, args.threshold)
+        if regressed:
+            regressions.append(key)
+            summary += "  REGRESSION"
+        peak = f"{result['peak_bytes'] / 1024 ** 2:.1f}" if result["peak_bytes"] is not None else "-"
+        print(f"{key:<36} {result['items_per_second']:>12,.0f} {peak:>9}  {summary}")
+
+    if args.save_baseline:
+        stored = {}
+        if Path(args.baseline).exists():
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        stored.setdefault("results", {}).update(results)
+        stored["python"] = platform.python_version()
+        stored["machine"] = platform.machine()
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
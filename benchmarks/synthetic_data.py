@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic census data for the script benchmarks.
+
+Mimics the shape of server/batch_data and the photos collection:
+- Gemini batch records whose text is fenced ```json, wrapped in ||| markers,
+  or wrapped in ||| with a "{return format}" prefix
+- ChatGPT batch records with |||...||| content
+- Photo documents with several substrates and a skewed pool of copy texts so
+  strings like "[illegible]" repeat often, as they do in the real data
+
+Everything is driven by random.Random(seed), so the same seed always produces
+the same records.
+
+Usage:
+    python benchmarks/synthetic_data.py gemini 10000 > gemini.jsonl
+    python benchmarks/synthetic_data.py photos 1000 > photos.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+
+MUNICIPALITIES = [
+    "Santa Ana", "Garden Grove", "Stanton", "San Clemente", "Fountain Valley",
+    "Anaheim", "Irvine", "Westminster", "Tustin", "Orange",
+]
+ID_PREFIXES = ["SantaAna", "gardengrove", "Stanton_phone_", "SanClemente", "Fountain_Valley_camera_"]
+ID_SUFFIXES = [".JPG", ".jpeg", ".jpg", ".JPg", ""]
+PLACEMENTS = ["Infrastructure", "Storefront", "Window", "Vehicle", "Sidewalk", "Banner"]
+TYPEFACE_STYLES = ["Sans serif", "Serif", "Script", "Display", "Handwritten", "Blackletter"]
+LETTERING = ["Printed", "Painted", "Embossed", "Neon", "Vinyl", "Engraved"]
+MESSAGE_FUNCTIONS = ["Operational information", "Branding", "Advertising", "Regulatory", "Wayfinding"]
+
+# Copy texts the real data repeats thousands of times; drawn with high weight
+COMMON_COPY = [
+    "[illegible]", "OPEN", "STOP", "NO PARKING", "EXIT", "PUSH", "PULL",
+    "Thank you for shopping", "Please wear a mask", "NOW HIRING",
+]
+WORDS = [
+    "Depository", "Pull", "down", "handle", "to", "deposit", "Market", "Liquor",
+    "Tacos", "Pho", "Salon", "Dental", "Insurance", "Auto", "Repair", "Bakery",
+    "Church", "Laundry", "Donuts", "Pharmacy", "Open", "Daily", "Hours", "Mon-Fri",
+]
+
+
+def _custom_id(rng, i):
+    return f"{rng.choice(ID_PREFIXES)}{i}{rng.choice(ID_SUFFIXES)}"
+
+
+def _copy_text(rng):
+    if rng.random() < 0.35:
+        return rng.choice(COMMON_COPY)
+    words = rng.choices(WORDS, k=rng.randint(1, 8))
+    text = " ".join(words)
+    # Occasional multi-line copy and arrows, as in the model output
+    if rng.random() < 0.2:
+        text = text.replace(" ", "\n", 1)
+    if rng.random() < 0.05:
+        text += " ⟶"
+    return text
+
+
+def make_model_output(rng):
+    """One parsed model response: {"substrateCount": n, "substrates": [...]}."""
+    substrates = []
+    for _ in range(rng.choices([1, 2, 3, 4], weights=[50, 30, 15, 5])[0]):
+        typefaces = []
+        for _ in range(rng.choices([1, 2, 3], weights=[60, 30, 10])[0]):
+            typefaces.append({
+                "typefaceStyle": rng.sample(TYPEFACE_STYLES, rng.randint(1, 2)),
+                "copy": _copy_text(rng),
+                "letteringOntology": rng.sample(LETTERING, rng.randint(1, 2)),
+                # The model sometimes returns a bare string here instead of a list
+                "messageFunction": (
+                    rng.choice(MESSAGE_FUNCTIONS) if rng.random() < 0.5
+                    else rng.sample(MESSAGE_FUNCTIONS, rng.randint(1, 2))
+                ),
+                "covidRelated": rng.random() < 0.1,
+                "additionalNotes": " ".join(rng.choices(WORDS, k=rng.randint(4, 16))),
+            })
+        substrates.append({
+            "placement": rng.choice(PLACEMENTS),
+            "additionalNotes": " ".join(rng.choices(WORDS, k=rng.randint(4, 20))),
+            "thisIsntReallyASign": rng.random() < 0.05,
+            "notASignDescription": "",
+            "typefaces": typefaces,
+            "confidence": rng.randint(1, 5),
+            "confidenceReasoning": " ".join(rng.choices(WORDS, k=rng.randint(6, 20))),
+            "additionalInfo": "",
+        })
+    return {"substrateCount": len(substrates), "substrates": substrates}
+
+
+def _wrap_model_text(rng, output):
+    body = json.dumps(output, indent=4, ensure_ascii=False)
+    style = rng.random()
+    if style < 0.7:
+        return f"```json\n{body}\n```"
+    if style < 0.9:
+        return f"|||{body}|||"
+    return f"|||{{return format}}\n{body}|||"
+
+
+def gemini_records(n, seed=0):
+    """Yield n Gemini batch records."""
+    rng = random.Random(seed)
+    for i in range(n):
+        text = _wrap_model_text(rng, make_model_output(rng))
+        yield {
+            "key": _custom_id(rng, i),
+            "response": {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]},
+        }
+
+
+def chatgpt_records(n, seed=0):
+    """Yield n ChatGPT batch records like those in server/batch_data."""
+    rng = random.Random(seed)
+    for i in range(n):
+        content = f"|||{json.dumps(make_model_output(rng), indent=4, ensure_ascii=False)}|||"
+        yield {
+            "id": f"batch_req_{i:024x}",
+            "custom_id": _custom_id(rng, i),
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]},
+            },
+        }
+
+
+def photo_documents(n, seed=0):
+    """Yield n photo documents shaped like the photos collection."""
+    rng = random.Random(seed)
+    for i in range(n):
+        custom_id = _custom_id(rng, i)
+        output = make_model_output(rng)
+        for substrate in output["substrates"]:
+            for typeface in substrate["typefaces"]:
+                if isinstance(typeface["messageFunction"], str):
+                    typeface["messageFunction"] = [typeface["messageFunction"]]
+        yield {
+            "_id": f"{i:024x}",
+            "id": custom_id,
+            "custom_id": custom_id,
+            "status": "unclaimed",
+            "initials": "BATCH",
+            "municipality": rng.choice(MUNICIPALITIES),
+            "substrateCount": output["substrateCount"],
+            "substrates": output["substrates"],
+        }
+
+
+GENERATORS = {
+    "gemini": gemini_records,
+    "chatgpt": chatgpt_records,
+    "photos": photo_documents,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic census data as JSONL on stdout")
+    parser.add_argument("kind", choices=sorted(GENERATORS))
+    parser.add_argument("count", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for record in GENERATORS[args.kind](args.count, seed=args.seed):
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,24 @@ import sys
 import argparse
 from pathlib import Path
 
+from custom_id_index import CustomIdIndex
+from photo_schema import SchemaValidationError, compile_photo_validator
+from shard_writer import ShardedWriter, existing_shards, positive_int_arg, shard_manifest_path, size_arg
+
+# How --merge picks the record to keep when a custom_id appears more than once
+MERGE_POLICIES = ("first", "last", "confidence")
+
+
+def default_meta_dir(output_dir):
+    """
+    Folder for sidecar files (rejects, shard manifests, merge reports).
+
+    Kept out of the output folder because the server's /batch/next serves
+    whatever file it finds first in server/batch_data.
+    """
+    output_dir = Path(output_dir).resolve()
+    return output_dir.parent / f"{output_dir.name}_meta"
+
 
 def extract_json_from_markdown(text, debug=False):
     """Extract JSON from markdown code blocks (```json ... ```)."""
@@ -100,8 +118,14 @@ def extract_json_from_markdown(text, debug=False):
     return text.strip()
 
 
-def convert_gemini_to_chatgpt(gemini_data, debug=False):
-    """Convert a single Gemini result to ChatGPT format."""
+def convert_gemini_to_chatgpt(gemini_data, debug=False, validator=None):
+    """
+    Convert a single Gemini result to ChatGPT format.
+
+    If a validator from photo_schema.compile_photo_validator is given, the
+    extracted JSON is checked against the Photo schema and SchemaValidationError
+    is raised for records the /import route would reject.
+    """
     # Extract the key (image identifier)
     custom_id = gemini_data.get("key", "")
     
@@ -154,6 +178,15 @@ def convert_gemini_to_chatgpt(gemini_data, debug=False):
         )
         raise ValueError(error_msg)
     
+    if validator is not None:
+        schema_errors, coerced = validator(parsed_json)
+        if schema_errors:
+            raise SchemaValidationError(custom_id, schema_errors)
+        if coerced:
+            if debug:
+                print(f"DEBUG: Coerced fields: {', '.join(coerced)}", file=sys.stderr)
+            json_content = json.dumps(parsed_json, ensure_ascii=False)
+    
     # Wrap JSON in ||| markers
     wrapped_content = f"|||{json_content}|||"
     
@@ -174,8 +207,167 @@ def convert_gemini_to_chatgpt(gemini_data, debug=False):
     return chatgpt_data
 
 
-def convert_file(input_path, output_path=None, debug=False, verbose=False):
-    """Convert a Gemini JSONL file to ChatGPT format."""
+def max_substrate_confidence(chatgpt_data):
+    """Highest substrate confidence in a converted record (None if there is none)."""
+    content = chatgpt_data["response"]["body"]["choices"][0]["message"]["content"]
+    parsed = json.loads(content[3:-3])
+    if not isinstance(parsed, dict):
+        return None
+    confidences = [
+        substrate.get("confidence")
+        for substrate in parsed.get("substrates") or []
+        if isinstance(substrate, dict)
+    ]
+    confidences = [c for c in confidences if isinstance(c, (int, float)) and not isinstance(c, bool)]
+    return max(confidences) if confidences else None
+
+
+def build_merge_index(jsonl_files, policy, validator=None, max_memory_keys=1_000_000):
+    """
+    First pass of --merge for the "last" and "confidence" policies: stream
+    every file and record, per case-folded custom_id, which
+    (file index, line number) should be kept.
+
+    Only records that convert (and validate) successfully are candidates, so a
+    broken re-run never replaces a good earlier result. Records without a key
+    are never indexed. Ties under the "confidence" policy keep the earlier
+    record. Every record is converted here and the winners again in the
+    second pass; the "first" policy needs no index pass (see DuplicateMerger).
+    """
+    if policy not in MERGE_POLICIES:
+        raise ValueError(f"Unknown merge policy: {policy} (expected one of {', '.join(MERGE_POLICIES)})")
+    
+    index = CustomIdIndex(max_memory_keys=max_memory_keys)
+    for file_idx, jsonl_file in enumerate(jsonl_files):
+        with open(jsonl_file, 'r', encoding='utf-8') as infile:
+            for line_num, line in enumerate(infile, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    chatgpt_data = convert_gemini_to_chatgpt(json.loads(line), validator=validator)
+                    score = max_substrate_confidence(chatgpt_data) if policy == "confidence" else None
+                except Exception:
+                    # Not a candidate; convert_file reports the error in the second pass
+                    continue
+                custom_id = chatgpt_data["custom_id"]
+                if not custom_id:
+                    continue
+                if policy != "last":
+                    existing = index.get(custom_id)
+                    if existing is not None:
+                        if policy == "first":
+                            continue
+                        existing_score = existing[2]
+                        if score is None or (existing_score is not None and score <= existing_score):
+                            continue
+                index.put(custom_id, (file_idx, line_num, score))
+    return index
+
+
+class DuplicateMerger:
+    """
+    --merge bookkeeping for one run over jsonl_files (a folder or a single file).
+
+    "first" is decided while converting: the first record that converts
+    successfully claims its custom_id. "last" and "confidence" need the index
+    pass of build_merge_index first, so they cost roughly twice the
+    conversion work. Dropped duplicates are written to duplicates_path.
+    """
+
+    def __init__(self, jsonl_files, policy, duplicates_path, validator=None, max_memory_keys=1_000_000):
+        if policy not in MERGE_POLICIES:
+            raise ValueError(f"Unknown merge policy: {policy} (expected one of {', '.join(MERGE_POLICIES)})")
+        self.jsonl_files = [Path(path) for path in jsonl_files]
+        self.policy = policy
+        self.duplicates_path = Path(duplicates_path)
+        self.dropped = 0
+        print(f"Merging duplicate custom_ids (policy: {policy})...")
+        if policy == "first":
+            # Filled while converting
+            self.index = CustomIdIndex(max_memory_keys=max_memory_keys)
+        else:
+            self.index = build_merge_index(
+                self.jsonl_files, policy, validator=validator, max_memory_keys=max_memory_keys
+            )
+            print(f"Indexed {len(self.index)} unique custom_id(s)"
+                  f"{' (spilled to disk)' if self.index.spilled else ''}")
+        print()
+        self.duplicates_path.parent.mkdir(parents=True, exist_ok=True)
+        self._duplicates_file = open(self.duplicates_path, 'w', encoding='utf-8')
+
+    def convert_options(self, file_idx):
+        """record_filter / accept_converted arguments of convert_file for jsonl_files[file_idx]."""
+        if self.policy == "first":
+            return {"accept_converted": self._make_first_claim(file_idx)}
+        return {"record_filter": self._make_record_filter(file_idx)}
+
+    def _record_duplicate(self, custom_id, file_idx, line_num, winner):
+        self._duplicates_file.write(json.dumps({
+            "custom_id": custom_id,
+            "file": self.jsonl_files[file_idx].name,
+            "line": line_num,
+            "kept_file": self.jsonl_files[winner[0]].name,
+            "kept_line": winner[1],
+        }) + '\n')
+        self.dropped += 1
+
+    def _make_record_filter(self, file_idx):
+        def keep(custom_id, line_num):
+            if not custom_id:
+                return True
+            winner = self.index.get(custom_id)
+            # Unindexed records failed conversion in the first pass; let
+            # convert_file report them as errors
+            if winner is None or (winner[0], winner[1]) == (file_idx, line_num):
+                return True
+            self._record_duplicate(custom_id, file_idx, line_num, winner)
+            return False
+        return keep
+
+    def _make_first_claim(self, file_idx):
+        def claim(custom_id, line_num):
+            if not custom_id:
+                return True
+            winner = self.index.get(custom_id)
+            if winner is None:
+                self.index.put(custom_id, (file_idx, line_num, None))
+                return True
+            self._record_duplicate(custom_id, file_idx, line_num, winner)
+            return False
+        return claim
+
+    def close(self):
+        self.index.close()
+        self._duplicates_file.close()
+
+
+def convert_file(input_path, output_path=None, debug=False, verbose=False,
+                 validate=False, coerce=False, rejects_path=None, meta_dir=None, record_filter=None,
+                 accept_converted=None, shard_size=None, shard_records=None,
+                 merge=None, merge_max_keys=1_000_000):
+    """
+    Convert a Gemini JSONL file to ChatGPT format.
+
+    With validate (or coerce), records failing the Photo schema check are left
+    out of the output and written to a rejects sidecar file together with
+    their schema errors (default: <output>_rejects.jsonl in meta_dir, which
+    defaults to <output>_meta/ next to the output file; convert_folder passes
+    <output folder>_meta/ instead).
+
+    record_filter, if given, is called as record_filter(key, line_num) for each
+    input record; records for which it returns False are skipped silently.
+    accept_converted works the same way but is called only for records that
+    converted (and validated) successfully, right before they are written.
+
+    With merge set to one of MERGE_POLICIES, duplicate custom_ids within the
+    file are dropped as in convert_folder, and listed in
+    duplicates_dropped.jsonl in meta_dir.
+
+    With shard_size (bytes) and/or shard_records, the output is written as
+    <output>_part0001.jsonl, ... shards instead of a single file, plus a
+    <output>_shards.json manifest in meta_dir (see shard_writer.py).
+    """
     input_path = Path(input_path)
     
     if not input_path.exists():
@@ -187,20 +379,68 @@ def convert_file(input_path, output_path=None, debug=False, verbose=False):
     else:
         output_path = Path(output_path)
     
+    meta_dir = Path(meta_dir) if meta_dir else output_path.parent / f"{output_path.stem}_meta"
+    
+    validator = None
+    if validate or coerce:
+        validator = compile_photo_validator(coerce=coerce)
+        if rejects_path is None:
+            rejects_path = meta_dir / f"{output_path.stem}_rejects{output_path.suffix}"
+        else:
+            rejects_path = Path(rejects_path)
+    
+    merger = None
+    if merge:
+        if record_filter is not None or accept_converted is not None:
+            raise ValueError("merge cannot be combined with record_filter or accept_converted")
+        merger = DuplicateMerger(
+            [input_path],
+            merge,
+            meta_dir / "duplicates_dropped.jsonl",
+            validator=validator,
+            max_memory_keys=merge_max_keys,
+        )
+        hooks = merger.convert_options(0)
+        record_filter = hooks.get("record_filter")
+        accept_converted = hooks.get("accept_converted")
+    
     # Process the file
     processed_count = 0
     error_count = 0
     errors = []
     skipped_count = 0
+    rejected_count = 0
+    rejects_file = None
     
     print(f"Reading from: {input_path}")
     print(f"Writing to: {output_path}")
+    if validator is not None:
+        print(f"Schema rejects to: {rejects_path}")
     if debug:
         print("DEBUG mode enabled - detailed logging will be shown", file=sys.stderr)
     print()
     
-    with open(input_path, 'r', encoding='utf-8') as infile, \
-         open(output_path, 'w', encoding='utf-8') as outfile:
+    # Outputs of an earlier run for the same output path (shards, or the single
+    # file) are removed so they are not uploaded twice alongside the new ones
+    sharded = shard_size is not None or shard_records is not None
+    manifest_path = meta_dir / shard_manifest_path(output_path).name
+    if sharded:
+        # ShardedWriter removes old shards itself
+        outfile = ShardedWriter(
+            output_path,
+            max_bytes=shard_size,
+            max_records=shard_records,
+            manifest_path=manifest_path
+        )
+        output_path.unlink(missing_ok=True)
+        print(f"Sharding output (max size: {shard_size or '-'} bytes, max records: {shard_records or '-'})")
+    else:
+        outfile = open(output_path, 'w', encoding='utf-8')
+        for stale in existing_shards(output_path):
+            stale.unlink()
+        manifest_path.unlink(missing_ok=True)
+    
+    with open(input_path, 'r', encoding='utf-8') as infile, outfile:
         
         for line_num, line in enumerate(infile, 1):
             line = line.strip()
@@ -211,6 +451,9 @@ def convert_file(input_path, output_path=None, debug=False, verbose=False):
                 # Parse Gemini JSON
                 gemini_data = json.loads(line)
                 
+                if record_filter is not None and not record_filter(gemini_data.get("key", ""), line_num):
+                    continue
+                
                 # Extract key for logging
                 custom_id = gemini_data.get("key", f"line_{line_num}")
                 
@@ -218,11 +461,26 @@ def convert_file(input_path, output_path=None, debug=False, verbose=False):
                     print(f"Processing line {line_num}: {custom_id}", file=sys.stderr)
                 
                 # Convert to ChatGPT format
-                chatgpt_data = convert_gemini_to_chatgpt(gemini_data, debug=debug)
+                chatgpt_data = convert_gemini_to_chatgpt(gemini_data, debug=debug, validator=validator)
                 
-                # Write to output file
-                outfile.write(json.dumps(chatgpt_data) + '\n')
-                processed_count += 1
+                if accept_converted is not None and not accept_converted(chatgpt_data["custom_id"], line_num):
+                    continue
+                
+            except SchemaValidationError as e:
+                error_msg = f"Line {line_num}: {e}"
+                errors.append(error_msg)
+                print(f"ERROR: {error_msg}", file=sys.stderr)
+                if rejects_file is None:
+                    rejects_path.parent.mkdir(parents=True, exist_ok=True)
+                    rejects_file = open(rejects_path, 'w', encoding='utf-8')
+                rejects_file.write(json.dumps({
+                    "line": line_num,
+                    "custom_id": e.custom_id,
+                    "errors": e.errors,
+                    "record": gemini_data,
+                }) + '\n')
+                rejected_count += 1
+                error_count += 1
                 
             except json.JSONDecodeError as e:
                 error_msg = f"Line {line_num}: Invalid JSON in input file - {e}"
@@ -269,13 +527,31 @@ def convert_file(input_path, output_path=None, debug=False, verbose=False):
                     print(f"DEBUG: Traceback:", file=sys.stderr)
                     traceback.print_exc(file=sys.stderr)
                 error_count += 1
+            
+            else:
+                # Write to output file. Outside the try, so a failing writer
+                # (missing folder, full disk) stops the run instead of being
+                # counted as an error for every record
+                outfile.write(json.dumps(chatgpt_data) + '\n')
+                processed_count += 1
+    
+    if rejects_file is not None:
+        rejects_file.close()
+    if merger is not None:
+        merger.close()
     
     # Print summary
     print(f"\nConversion complete!")
     print(f"  Successfully processed: {processed_count}")
     print(f"  Errors: {error_count}")
+    if rejected_count > 0:
+        print(f"  Rejected by schema validation: {rejected_count} (see {rejects_path})")
+    if sharded:
+        print(f"  Shards written: {len(outfile.shards)} (manifest: {outfile.manifest_path})")
     if skipped_count > 0:
         print(f"  Skipped (no JSON found): {skipped_count}")
+    if merger is not None:
+        print(f"  Duplicates dropped: {merger.dropped} (see {merger.duplicates_path})")
     
     if errors:
         if len(errors) <= 20:
@@ -291,8 +567,20 @@ def convert_file(input_path, output_path=None, debug=False, verbose=False):
     return processed_count, error_count, skipped_count
 
 
-def convert_folder(input_folder, output_folder=None, debug=False, verbose=False):
-    """Convert all JSONL files in a folder to ChatGPT format."""
+def convert_folder(input_folder, output_folder=None, debug=False, verbose=False,
+                   validate=False, coerce=False, merge=None, merge_max_keys=1_000_000,
+                   shard_size=None, shard_records=None):
+    """
+    Convert all JSONL files in a folder to ChatGPT format.
+
+    With merge set to one of MERGE_POLICIES, a custom_id appearing in several
+    files (e.g. after a batch re-run) is emitted only once: the first or last
+    occurrence in filename order, or the one with the highest substrate
+    confidence. Dropped duplicates are listed in duplicates_dropped.jsonl in
+    <output folder>_meta/. Records with an empty or missing key are unrelated
+    to each other, so they are never merged; they pass through for the
+    importer to report. See DuplicateMerger for the cost of each policy.
+    """
     input_folder = Path(input_folder)
     
     if not input_folder.exists():
@@ -322,13 +610,27 @@ def convert_folder(input_folder, output_folder=None, debug=False, verbose=False)
     print(f"Output folder: {output_folder}")
     print()
     
+    jsonl_files = sorted(jsonl_files)
+    
+    meta_dir = default_meta_dir(output_folder)
+    merger = None
+    if merge:
+        validator = compile_photo_validator(coerce=coerce) if (validate or coerce) else None
+        merger = DuplicateMerger(
+            jsonl_files,
+            merge,
+            meta_dir / "duplicates_dropped.jsonl",
+            validator=validator,
+            max_memory_keys=merge_max_keys,
+        )
+    
     # Process each file
     total_processed = 0
     total_errors = 0
     total_skipped = 0
     files_processed = 0
     
-    for jsonl_file in sorted(jsonl_files):
+    for file_idx, jsonl_file in enumerate(jsonl_files):
         print(f"{'='*60}")
         print(f"Processing: {jsonl_file.name}")
         print(f"{'='*60}")
@@ -341,7 +643,13 @@ def convert_folder(input_folder, output_folder=None, debug=False, verbose=False)
                 jsonl_file, 
                 output_file, 
                 debug=debug, 
-                verbose=verbose
+                verbose=verbose,
+                validate=validate,
+                coerce=coerce,
+                meta_dir=meta_dir,
+                shard_size=shard_size,
+                shard_records=shard_records,
+                **(merger.convert_options(file_idx) if merger else {})
             )
             total_processed += processed
             total_errors += errors
@@ -355,6 +663,9 @@ def convert_folder(input_folder, output_folder=None, debug=False, verbose=False)
                 traceback.print_exc(file=sys.stderr)
             print()
     
+    if merger is not None:
+        merger.close()
+    
     # Print overall summary
     print(f"{'='*60}")
     print("OVERALL SUMMARY")
@@ -363,9 +674,11 @@ def convert_folder(input_folder, output_folder=None, debug=False, verbose=False)
     print(f"Total entries successfully converted: {total_processed}")
     print(f"Total errors: {total_errors}")
     print(f"Total skipped (no JSON found): {total_skipped}")
+    if merger is not None:
+        print(f"Total duplicates dropped: {merger.dropped} (see {merger.duplicates_path})")
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description="Convert Gemini batch results JSONL to ChatGPT format",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -380,6 +693,18 @@ Examples:
   
   # Convert all JSONL files to a specific output folder
   python convert_gemini_to_chatgpt.py /path/to/folder -o /path/to/output_folder
+  
+  # Check records against the Photo schema, fixing string -> [string] etc.
+  python convert_gemini_to_chatgpt.py input.jsonl --coerce
+  
+  # Keep one record per custom_id across re-run batch files
+  python convert_gemini_to_chatgpt.py /path/to/folder --merge last
+  
+  # Drop duplicate custom_ids within one file
+  python convert_gemini_to_chatgpt.py input.jsonl --merge first
+  
+  # Split output into upload-sized shards for /batch/import
+  python convert_gemini_to_chatgpt.py input.jsonl --shard-size 50MB --shard-records 5000
         """
     )
     
@@ -406,7 +731,55 @@ Examples:
         help='Enable verbose mode (show progress)'
     )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        '--validate',
+        action='store_true',
+        help='Validate each record against the Photo schema; failures go to <output>_rejects.jsonl in '
+             '<output>_meta/ (single file) or <output folder>_meta/ (folder input)'
+    )
+    
+    parser.add_argument(
+        '--coerce',
+        action='store_true',
+        help='Like --validate, but fix coercible values (e.g. string -> [string]) instead of rejecting them'
+    )
+    
+    parser.add_argument(
+        '--rejects',
+        dest='rejects_path',
+        help='Rejects sidecar file path (single file input only). Default: <output>_meta/<output>_rejects.jsonl'
+    )
+    
+    parser.add_argument(
+        '--merge',
+        choices=MERGE_POLICIES,
+        help='Emit one record per custom_id (case-insensitive) across all input files, keeping the first, last or '
+             'highest-confidence occurrence. "last" and "confidence" read every record twice (about 2x conversion time)'
+    )
+    
+    parser.add_argument(
+        '--merge-max-keys',
+        type=int,
+        default=1_000_000,
+        help='Unique custom_ids kept in memory during --merge before spilling to disk (default: 1000000, about 50 MB)'
+    )
+    
+    parser.add_argument(
+        '--shard-size',
+        type=size_arg,
+        help='Split output into shards of at most this size (e.g. 50MB); records are never split'
+    )
+    
+    parser.add_argument(
+        '--shard-records',
+        type=positive_int_arg,
+        help='Split output into shards of at most this many records'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    if args.rejects_path and Path(args.input_path).is_dir():
+        parser.error("--rejects only applies to single file input (folders write <output folder>_meta/*_rejects.jsonl)")
     
     try:
         input_path = Path(args.input_path)
@@ -414,10 +787,33 @@ Examples:
         # Check if it's a file or folder
         if input_path.is_file():
             # Single file conversion
-            convert_file(args.input_path, args.output_path, debug=args.debug, verbose=args.verbose)
+            convert_file(
+                args.input_path,
+                args.output_path,
+                debug=args.debug,
+                verbose=args.verbose,
+                validate=args.validate,
+                coerce=args.coerce,
+                rejects_path=args.rejects_path,
+                shard_size=args.shard_size,
+                shard_records=args.shard_records,
+                merge=args.merge,
+                merge_max_keys=args.merge_max_keys
+            )
         elif input_path.is_dir():
             # Folder conversion
-            convert_folder(args.input_path, args.output_path, debug=args.debug, verbose=args.verbose)
+            convert_folder(
+                args.input_path,
+                args.output_path,
+                debug=args.debug,
+                verbose=args.verbose,
+                validate=args.validate,
+                coerce=args.coerce,
+                merge=args.merge,
+                merge_max_keys=args.merge_max_keys,
+                shard_size=args.shard_size,
+                shard_records=args.shard_records
+            )
         else:
             raise ValueError(f"Input path is neither a file nor a directory: {input_path}")
             
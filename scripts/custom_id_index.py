@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Bounded-memory index of custom_id -> winning record location.
+
+Used by convert_gemini_to_chatgpt.py --merge to pick one record per custom_id
+across many batch files. Keys are case-folded (the /import route matches
+custom_id case-insensitively) and stored as 64-bit BLAKE2b digests.
+
+In memory the index is an open-addressing hash table over flat arrays, about
+24 bytes per slot (roughly 35-70 bytes per key depending on load, ~50 MB at
+a million keys) instead of the ~150 bytes a dict of tuples costs. Once it
+grows past max_memory_keys it is moved into a temporary SQLite file and all
+further lookups go there.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+from array import array
+
+
+def custom_id_digest(custom_id):
+    """Compact, case-insensitive key for a custom_id (a non-zero 64-bit int)."""
+    digest = hashlib.blake2b(str(custom_id).casefold().encode("utf-8"), digest_size=8).digest()
+    # 0 marks an empty slot in _PackedTable
+    return int.from_bytes(digest, "little") or 1
+
+
+class _PackedTable:
+    """
+    Hash table of digest -> (file_idx, line_num, score) with linear probing.
+
+    Keys, file indexes, line numbers and scores live in four parallel arrays;
+    a score of None is stored as NaN.
+    """
+
+    MAX_LOAD = 0.7
+
+    def __init__(self, capacity=1024):
+        self.count = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self._mask = capacity - 1
+        self._limit = int(capacity * self.MAX_LOAD)
+        self._keys = array("Q", bytes(8 * capacity))
+        self._files = array("I", bytes(4 * capacity))
+        self._lines = array("I", bytes(4 * capacity))
+        self._scores = array("d", bytes(8 * capacity))
+
+    def _slot(self, key):
+        keys = self._keys
+        mask = self._mask
+        i = key & mask
+        while True:
+            found = keys[i]
+            if found == key or found == 0:
+                return i
+            i = (i + 1) & mask
+
+    def get(self, key):
+        i = self._slot(key)
+        if self._keys[i] == 0:
+            return None
+        score = self._scores[i]
+        return self._files[i], self._lines[i], None if score != score else score
+
+    def put(self, key, entry):
+        i = self._slot(key)
+        if self._keys[i] == 0:
+            if self.count >= self._limit:
+                self._grow()
+                i = self._slot(key)
+            self._keys[i] = key
+            self.count += 1
+        file_idx, line_num, score = entry
+        self._files[i] = file_idx
+        self._lines[i] = line_num
+        self._scores[i] = float("nan") if score is None else score
+
+    def _grow(self):
+        keys, files, lines, scores = self._keys, self._files, self._lines, self._scores
+        self._allocate((self._mask + 1) * 2)
+        new_keys = self._keys
+        mask = self._mask
+        for i, key in enumerate(keys):
+            if key:
+                j = key & mask
+                while new_keys[j]:
+                    j = (j + 1) & mask
+                new_keys[j] = key
+                self._files[j] = files[i]
+                self._lines[j] = lines[i]
+                self._scores[j] = scores[i]
+
+    def items(self):
+        for i, key in enumerate(self._keys):
+            if key:
+                score = self._scores[i]
+                yield key, (self._files[i], self._lines[i], None if score != score else score)
+
+
+class CustomIdIndex:
+    """
+    Map of custom_id -> (file_idx, line_num, score).
+
+    Entries stay in an in-memory table until max_memory_keys is exceeded, then
+    the whole index spills to an on-disk SQLite table in spill_dir (default:
+    system temp).
+    """
+
+    def __init__(self, max_memory_keys=1_000_000, spill_dir=None):
+        self.max_memory_keys = max_memory_keys
+        self.spill_dir = spill_dir
+        self._memory = _PackedTable()
+        self._db = None
+        self._db_path = None
+        self._db_count = 0
+
+    @property
+    def spilled(self):
+        return self._db is not None
+
+    def __len__(self):
+        return self._db_count if self._db is not None else self._memory.count
+
+    def get(self, custom_id):
+        key = custom_id_digest(custom_id)
+        if self._db is None:
+            return self._memory.get(key)
+        row = self._db.execute(
+            "SELECT file_idx, line_num, score FROM ids WHERE k = ?", (key.to_bytes(8, "little"),)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def put(self, custom_id, entry):
+        key = custom_id_digest(custom_id)
+        if self._db is None:
+            self._memory.put(key, entry)
+            if self._memory.count > self.max_memory_keys:
+                self._spill()
+            return
+        key = key.to_bytes(8, "little")
+        cursor = self._db.execute(
+            "UPDATE ids SET file_idx = ?, line_num = ?, score = ? WHERE k = ?",
+            (*entry, key),
+        )
+        if cursor.rowcount == 0:
+            self._db.execute("INSERT INTO ids VALUES (?, ?, ?, ?)", (key, *entry))
+            self._db_count += 1
+
+    def _spill(self):
+        fd, self._db_path = tempfile.mkstemp(prefix="custom_id_index_", suffix=".sqlite", dir=self.spill_dir)
+        os.close(fd)
+        self._db = sqlite3.connect(self._db_path)
+        self._db.execute("PRAGMA journal_mode = OFF")
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute(
+            "CREATE TABLE ids (k BLOB PRIMARY KEY, file_idx INTEGER, line_num INTEGER, score REAL)"
+        )
+        self._db.executemany(
+            "INSERT INTO ids VALUES (?, ?, ?, ?)",
+            ((key.to_bytes(8, "little"), *entry) for key, entry in self._memory.items()),
+        )
+        self._db_count = self._memory.count
+        self._memory = _PackedTable()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            os.remove(self._db_path)
+        self._memory = _PackedTable()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
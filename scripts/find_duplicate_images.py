@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Find duplicate photos by image content.
+
+find_duplicate_texts.py only matches substrates whose transcribed text is
+identical, so the same sign photographed twice (or uploaded under two names)
+is missed whenever the model transcribed it differently. This script works on
+the images themselves, in a local photo folder (e.g. a local copy of the S3
+bucket behind get_photo_url).
+
+For every image it computes two 64-bit perceptual hashes from a downscaled
+grayscale copy:
+    aHash  pixel brighter than the mean of an 8x8 thumbnail
+    dHash  pixel brighter than its right neighbour in a 9x8 thumbnail
+
+Files are read and hashed concurrently by a bounded thread pool (Pillow
+releases the GIL while decoding). Hashes are cached by path, size and mtime
+in a per-folder file under the user cache directory (never in the photo
+folder), so re-runs only hash new or changed files. Near-duplicates are found with a
+BK-tree over dHash (Hamming distance) and confirmed with aHash, instead of
+comparing all pairs.
+
+Requires Pillow (see requirements.txt).
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from find_duplicate_texts import get_photo_url, project_root
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tif", ".tiff", ".webp"}
+HASH_SIZE = 8
+CACHE_VERSION = 1
+
+
+def _load_pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Pillow is required for image hashing: pip install -r scripts/requirements.txt")
+    return Image
+
+
+def _bits_to_int(bits):
+    value = 0
+    for bit in bits:
+        value = (value << 1) | bit
+    return value
+
+
+def compute_image_hashes(path):
+    """Return (ahash, dhash) as 64-bit ints for the image at path."""
+    Image = _load_pillow()
+    with Image.open(path) as img:
+        # Let the JPEG decoder downscale while decoding (much cheaper than a full decode)
+        img.draft("L", (HASH_SIZE * 8, HASH_SIZE * 8))
+        gray = img.convert("L")
+    # tobytes() on a mode "L" image is one byte per pixel, row by row
+    small = list(gray.resize((HASH_SIZE, HASH_SIZE), Image.BILINEAR).tobytes())
+    mean = sum(small) / len(small)
+    ahash = _bits_to_int(1 if p > mean else 0 for p in small)
+
+    wide = list(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR).tobytes())
+    row = HASH_SIZE + 1
+    dhash = _bits_to_int(
+        1 if wide[y * row + x] > wide[y * row + x + 1] else 0
+        for y in range(HASH_SIZE)
+        for x in range(HASH_SIZE)
+    )
+    return ahash, dhash
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """BK-tree over integer hashes with Hamming distance."""
+
+    def __init__(self):
+        self._root = None  # [hash, items, {distance: child}]
+
+    def add(self, value, item):
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value, max_distance):
+        """Yield (item, distance) for every stored hash within max_distance."""
+        if self._root is None:
+            return
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                for item in node[1]:
+                    yield item, distance
+            # Triangle inequality: only children in [d - max, d + max] can match
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+
+
+def default_cache_path(photo_dir):
+    """Per-folder hash cache under $XDG_CACHE_HOME (default ~/.cache)."""
+    cache_root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    folder_id = hashlib.sha1(str(Path(photo_dir).resolve()).encode("utf-8")).hexdigest()[:16]
+    return Path(cache_root) / "typeface-analyzer" / f"image_hashes_{folder_id}.json"
+
+
+def load_hash_cache(cache_path):
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def save_hash_cache(cache_path, files):
+    """Write the cache atomically. Returns False (with a warning) if it cannot be written."""
+    tmp_path = cache_path.parent / f".{cache_path.name}.tmp"
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": files}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"WARNING: Could not write hash cache {cache_path}: {e}", file=sys.stderr)
+        return False
+    return True
+
+
+def list_images(photo_dir):
+    return sorted(
+        path for path in Path(photo_dir).rglob("*")
+        if path.suffix.lower() in IMAGE_EXTENSIONS and not path.name.startswith(".") and path.is_file()
+    )
+
+
+def hash_images(photo_dir, cache_path, threads=8, verbose=False):
+    """
+    Hash every image under photo_dir, reusing cached hashes for unchanged files.
+
+    Returns (hashes, errors): hashes maps relative path -> (ahash, dhash),
+    errors maps relative path -> error message.
+    """
+    photo_dir = Path(photo_dir)
+    cache = load_hash_cache(cache_path)
+    hashes = {}
+    errors = {}
+    fresh = {}
+    to_hash = []
+
+    for path in list_images(photo_dir):
+        rel = path.relative_to(photo_dir).as_posix()
+        stat = path.stat()
+        cached = cache.get(rel)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            hashes[rel] = (int(cached["ahash"], 16), int(cached["dhash"], 16))
+            fresh[rel] = cached
+        else:
+            to_hash.append((rel, path, stat))
+
+    print(f"Found {len(hashes) + len(to_hash)} image(s); {len(hashes)} cached, {len(to_hash)} to hash")
+
+    if to_hash:
+        _load_pillow()
+        for done, ((rel, path, stat), result) in enumerate(_prefetch_hashes(to_hash, threads), 1):
+            if isinstance(result, Exception):
+                errors[rel] = f"{type(result).__name__}: {result}"
+                continue
+            hashes[rel] = result
+            fresh[rel] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "ahash": f"{result[0]:016x}",
+                "dhash": f"{result[1]:016x}",
+            }
+            if verbose and done % 100 == 0:
+                print(f"  Hashed {done}/{len(to_hash)}", file=sys.stderr)
+
+    # Only files that still exist are written back
+    save_hash_cache(cache_path, fresh)
+    return hashes, errors
+
+
+def _prefetch_hashes(jobs, threads):
+    """
+    Yield (job, result) in order while keeping at most 2 * threads files in
+    flight, so memory stays bounded however many images there are.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = deque()
+        jobs = iter(jobs)
+        for job in itertools.islice(jobs, threads * 2):
+            pending.append((job, pool.submit(_hash_job, job[1])))
+        while pending:
+            job, future = pending.popleft()
+            for next_job in itertools.islice(jobs, 1):
+                pending.append((next_job, pool.submit(_hash_job, next_job[1])))
+            yield job, future.result()
+
+
+def _hash_job(path):
+    try:
+        return compute_image_hashes(path)
+    except Exception as e:
+        return e
+
+
+def find_duplicate_groups(hashes, max_distance=6):
+    """
+    Group images whose dHash and aHash are both within max_distance bits.
+
+    Returns a list of groups (lists of relative paths), largest first.
+    """
+    tree = BKTree()
+    for rel, (_, dhash) in hashes.items():
+        tree.add(dhash, rel)
+
+    parent = {rel: rel for rel in hashes}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for rel, (ahash, dhash) in hashes.items():
+        for other, _ in tree.search(dhash, max_distance):
+            if other == rel or hamming(ahash, hashes[other][0]) > max_distance:
+                continue
+            root_a, root_b = find(rel), find(other)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = {}
+    for rel in hashes:
+        groups.setdefault(find(rel), []).append(rel)
+    return sorted(
+        (sorted(members) for members in groups.values() if len(members) > 1),
+        key=lambda members: (-len(members), members[0]),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Find duplicate photos by perceptual image hash",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("photo_dir", help="Local folder of photos (e.g. a copy of the S3 photo bucket)")
+    parser.add_argument(
+        "--max-distance",
+        type=int,
+        default=6,
+        help="Maximum differing bits (of 64) in both dHash and aHash to count as a duplicate (default: 6)",
+    )
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent image reads (default: 8)")
+    parser.add_argument(
+        "--cache",
+        metavar="FILE",
+        help="Hash cache file (default: a per-folder file in ~/.cache/typeface-analyzer/)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        default="duplicate_images.md",
+        help="Output markdown file (default: duplicate_images.md)",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show hashing progress")
+    args = parser.parse_args(argv)
+
+    photo_dir = Path(args.photo_dir)
+    if not photo_dir.is_dir():
+        print(f"Error: Photo folder not found: {photo_dir}", file=sys.stderr)
+        return 1
+    cache_path = Path(args.cache) if args.cache else default_cache_path(photo_dir)
+
+    try:
+        hashes, errors = hash_images(photo_dir, cache_path, threads=max(1, args.threads), verbose=args.verbose)
+    except ImportError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for rel, error in sorted(errors.items()):
+        print(f"ERROR: {rel}: {error}", file=sys.stderr)
+
+    groups = find_duplicate_groups(hashes, max_distance=args.max_distance)
+
+    output_path = args.output
+    if not os.path.isabs(output_path):
+        output_path = os.path.join(project_root, output_path)
+
+    lines = [
+        "# Duplicate Images Report",
+        "",
+        f"Found **{len(groups)}** group(s) of duplicate images among {len(hashes)} image(s) "
+        f"(dHash and aHash within {args.max_distance} bits).",
+        "",
+    ]
+    if groups:
+        for members in groups:
+            lines.append(f"## [{len(members)} images] {Path(members[0]).name}")
+            lines.append("")
+            base_ahash, base_dhash = hashes[members[0]]
+            for rel in members:
+                ahash, dhash = hashes[rel]
+                url = get_photo_url(Path(rel).name)
+                lines.append(
+                    f"- [{rel}]({url}) (dHash distance {hamming(base_dhash, dhash)}, "
+                    f"aHash distance {hamming(base_ahash, ahash)})"
+                )
+            lines.append("")
+            lines.append("---")
+            lines.append("")
+    else:
+        lines.append("No duplicate images found.")
+        lines.append("")
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+    print(f"Found {len(groups)} duplicate group(s); {len(errors)} image(s) could not be read")
+    print(f"Report written to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
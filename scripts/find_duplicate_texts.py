@@ -18,6 +18,8 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 sys.path.insert(0, project_root)
 
+from text_normalization import DEFAULT_STEPS, EXACT_STEPS, STEPS, TextNormalizer, steps_arg
+
 
 S3_PHOTO_BASE = "https://typeface-s3-photo-bucket.s3.us-west-1.amazonaws.com/Font+Census+Data"
 
@@ -30,39 +32,47 @@ def get_photo_url(custom_id):
     return f"{S3_PHOTO_BASE}/{encoded}"
 
 
+# Strip and collapse runs of whitespace (including newlines) to single space
+default_normalizer = TextNormalizer(DEFAULT_STEPS)
+
+
 def normalize_text(text):
     """Normalize text for comparison (strip, collapse whitespace)."""
-    if text is None or not isinstance(text, str):
+    return default_normalizer(text)
+
+
+def fingerprint_normalized_texts(normalized_texts):
+    """Fingerprint a list of already-normalized copy texts (None if empty)."""
+    if not normalized_texts:
         return None
-    # Strip and collapse runs of whitespace (including newlines) to single space
-    normalized = " ".join(text.split())
-    return normalized if normalized else None
+    # Sorted for order-independent matching; tuple preserves multiplicity
+    fingerprint = tuple(sorted(normalized_texts))
+    return hashlib.sha256(str(fingerprint).encode("utf-8")).hexdigest()
 
 
-def get_substrate_fingerprint(copy_texts):
+def get_substrate_fingerprint(copy_texts, normalizer=None):
     """
     Create a hashable fingerprint for a substrate from its typeface copy values.
     Uses sorted tuple to make order-independent while preserving multiplicity.
     """
+    normalizer = normalizer or default_normalizer
     normalized_list = []
     for text in copy_texts:
-        n = normalize_text(text)
+        n = normalizer(text)
         if n is not None:
             normalized_list.append(n)
-    if not normalized_list:
-        return None
-    # Sorted for order-independent matching; tuple preserves multiplicity
-    fingerprint = tuple(sorted(normalized_list))
-    return hashlib.sha256(str(fingerprint).encode("utf-8")).hexdigest()
+    return fingerprint_normalized_texts(normalized_list)
 
 
-def extract_substrate_occurrences(photos):
+def extract_substrate_occurrences(photos, normalizer=None):
     """
     Extract substrates with their full typeface copy sets.
-    Two substrates match only if all typeface texts within them are identical.
+    Two substrates match only if all typeface texts within them are identical
+    after normalization (default: whitespace collapse; see text_normalization.py).
 
     Returns: dict mapping substrate_fingerprint -> list of substrate occurrences
     """
+    normalizer = normalizer or default_normalizer
     fingerprint_to_occurrences = defaultdict(list)
 
     for photo in photos:
@@ -83,14 +93,12 @@ def extract_substrate_occurrences(photos):
             if not copy_texts:
                 continue
 
-            fingerprint = get_substrate_fingerprint(copy_texts)
+            # Normalize each copy once; used for both fingerprint and display
+            normalized_texts = [n for n in map(normalizer, copy_texts) if n is not None]
+            fingerprint = fingerprint_normalized_texts(normalized_texts)
             if fingerprint is None:
                 continue
 
-            # Normalized copy texts for display
-            normalized_texts = [normalize_text(t) for t in copy_texts]
-            normalized_texts = [n for n in normalized_texts if n is not None]
-
             fingerprint_to_occurrences[fingerprint].append(
                 {
                     "copy_texts": copy_texts,
@@ -108,37 +116,33 @@ def extract_substrate_occurrences(photos):
 
 def load_photos_from_mongodb():
     """Load all photos from MongoDB."""
-    from pymongo import MongoClient
-    from dotenv import load_dotenv
-
-    env_path = os.path.join(project_root, "server", ".env")
-    load_dotenv(env_path)
-
-    mongodb_uri = os.environ.get("MONGODB_URI")
-    if not mongodb_uri:
-        raise ValueError("MONGODB_URI not found. Set it in server/.env")
-
-    client = MongoClient(mongodb_uri)
-    db = client["visualTextDB"]
-    photos_collection = db["photos"]
+    from mongo_client import get_photos_collection
 
-    photos = list(photos_collection.find({}))
-    client.close()
-    return photos
+    photos_collection = get_photos_collection()
+    return list(photos_collection.find({}))
 
 
-def main():
+def main(argv=None):
     import argparse
 
     parser = argparse.ArgumentParser(
         description="Find duplicate copy/text values across all photos",
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
-    parser.add_argument(
+    normalization = parser.add_mutually_exclusive_group()
+    normalization.add_argument(
         "--exact",
         action="store_true",
         help="Match exact text only (no whitespace normalization)",
     )
+    normalization.add_argument(
+        "--normalize",
+        metavar="STEPS",
+        type=steps_arg,
+        default=DEFAULT_STEPS,
+        help=f"Comma-separated normalization steps applied in order (available: {', '.join(STEPS)}; "
+             f"default: {','.join(DEFAULT_STEPS)})",
+    )
     parser.add_argument(
         "--min-occurrences",
         type=int,
@@ -152,12 +156,12 @@ def main():
         default="duplicate_substrates.md",
         help="Output markdown file (default: duplicate_substrates.md)",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.exact:
-        # Override normalize to identity
-        global normalize_text
-        normalize_text = lambda t: (t.strip() if t and isinstance(t, str) else None)
+        normalizer = TextNormalizer(EXACT_STEPS, keep_blank=True)
+    else:
+        normalizer = TextNormalizer(args.normalize)
 
     # Load photos from MongoDB
     try:
@@ -167,7 +171,12 @@ def main():
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
-    fingerprint_to_occurrences = extract_substrate_occurrences(photos)
+    fingerprint_to_occurrences = extract_substrate_occurrences(photos, normalizer=normalizer)
+    stats = normalizer.stats()
+    print(
+        f"Ran {stats['misses']} normalization(s) for {stats['hits'] + stats['misses']} "
+        f"lookup(s) (cache hit rate {stats['hit_rate']:.1%}, steps: {','.join(normalizer.steps)})"
+    )
 
     # Find duplicates (substrates with identical typeface sets appearing 2+ times)
     duplicates = {
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Shared MongoDB access for the scripts.
+
+Finds server/.env, builds MongoClient instances and looks up the
+visualTextDB.photos collection in one place. Clients are cached per URI and
+settings, so scripts chained through typeface_tools.py in one process share a
+single connection pool. pymongo and python-dotenv are imported on first use,
+which keeps --help and argument errors fast.
+
+Connection settings default to the environment (or server/.env) and can be
+overridden with configure():
+
+    MONGODB_URI                          (required)
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS  (default: 10000)
+    MONGODB_CONNECT_TIMEOUT_MS           (default: 10000)
+    MONGODB_SOCKET_TIMEOUT_MS            (default: none)
+    MONGODB_MAX_POOL_SIZE                (default: 10)
+    MONGODB_READ_PREFERENCE              (default: primary)
+"""
+
+import atexit
+import os
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+ENV_PATH = os.path.join(project_root, "server", ".env")
+
+DATABASE_NAME = "visualTextDB"
+PHOTOS_COLLECTION = "photos"
+
+READ_PREFERENCES = ("primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest")
+
+_overrides = {}
+_clients = {}
+_env_loaded = False
+
+
+def load_env():
+    """Load server/.env into the environment (once)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv(ENV_PATH)
+    _env_loaded = True
+
+
+def _int_env(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def configure(timeout_ms=None, max_pool_size=None, read_preference=None):
+    """Override connection settings for clients created after this call."""
+    if read_preference is not None and read_preference not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference: {read_preference} (expected one of {', '.join(READ_PREFERENCES)})")
+    for key, value in (
+        ("timeout_ms", timeout_ms),
+        ("max_pool_size", max_pool_size),
+        ("read_preference", read_preference),
+    ):
+        if value is not None:
+            _overrides[key] = value
+
+
+def client_settings():
+    """MongoClient keyword arguments from the environment and configure()."""
+    load_env()
+    timeout_ms = _overrides.get("timeout_ms")
+    settings = {
+        "serverSelectionTimeoutMS": timeout_ms or _int_env("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 10000),
+        "connectTimeoutMS": timeout_ms or _int_env("MONGODB_CONNECT_TIMEOUT_MS", 10000),
+        "maxPoolSize": _overrides.get("max_pool_size") or _int_env("MONGODB_MAX_POOL_SIZE", 10),
+        "readPreference": _overrides.get("read_preference") or os.environ.get("MONGODB_READ_PREFERENCE", "primary"),
+    }
+    socket_timeout_ms = _int_env("MONGODB_SOCKET_TIMEOUT_MS", None)
+    if socket_timeout_ms:
+        settings["socketTimeoutMS"] = socket_timeout_ms
+    return settings
+
+
+def get_mongodb_uri():
+    load_env()
+    mongodb_uri = os.environ.get("MONGODB_URI")
+    if not mongodb_uri:
+        raise ValueError("MONGODB_URI not found. Set it in server/.env")
+    return mongodb_uri
+
+
+def get_client(uri=None):
+    """Return a shared MongoClient for uri (default: MONGODB_URI)."""
+    uri = uri or get_mongodb_uri()
+    settings = client_settings()
+    key = (uri, tuple(sorted(settings.items())))
+    client = _clients.get(key)
+    if client is None:
+        from pymongo import MongoClient
+
+        client = MongoClient(uri, **settings)
+        _clients[key] = client
+    return client
+
+
+def get_photos_collection(client=None):
+    """Return the visualTextDB.photos collection on a shared client."""
+    client = client or get_client()
+    return client[DATABASE_NAME][PHOTOS_COLLECTION]
+
+
+@atexit.register
+def close_clients():
+    """Close every client created by get_client()."""
+    while _clients:
+        _, client = _clients.popitem()
+        client.close()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Validate model output against the Photo schema before it reaches /batch/import.
+
+The field definitions below mirror server/models/Photo.js (photoSchema,
+substrateSchema, typefaceSchema). They are compiled once into a validator made
+of small per-field check functions, so validating a record is a straight run
+over fixed field tuples with no schema walking at runtime.
+
+Usage:
+    validate = compile_photo_validator(coerce=True)
+    errors, coerced = validate(parsed_json)
+"""
+
+import math
+
+STRING = "String"
+STRING_ARRAY = "[String]"
+NUMBER = "Number"
+BOOLEAN = "Boolean"
+
+# Mirrors typefaceSchema in server/models/Photo.js
+TYPEFACE_FIELDS = (
+    ("typefaceStyle", STRING_ARRAY),
+    ("copy", STRING),
+    ("letteringOntology", STRING_ARRAY),
+    ("messageFunction", STRING_ARRAY),
+    ("covidRelated", BOOLEAN),
+    ("additionalNotes", STRING),
+)
+
+# Mirrors substrateSchema; a tuple of field definitions is an array of subdocuments
+SUBSTRATE_FIELDS = (
+    ("placement", STRING),
+    ("additionalNotes", STRING),
+    ("thisIsntReallyASign", BOOLEAN),
+    ("notASignDescription", STRING),
+    ("typefaces", TYPEFACE_FIELDS),
+    ("confidence", NUMBER),
+    ("confidenceReasoning", STRING),
+    ("additionalInfo", STRING),
+)
+
+# The part of photoSchema that comes from model output (the rest is set by /import)
+PHOTO_FIELDS = (
+    ("substrateCount", NUMBER),
+    ("substrates", SUBSTRATE_FIELDS),
+)
+
+# Fields the /import route dereferences unconditionally (parsedData.substrates.map,
+# substrate.typefaces.map), so they must be present lists
+REQUIRED_FIELDS = frozenset({"substrates", "typefaces"})
+
+
+class SchemaValidationError(ValueError):
+    """Raised when a parsed record does not match the Photo schema."""
+
+    def __init__(self, custom_id, errors):
+        self.custom_id = custom_id
+        self.errors = errors
+        preview = "; ".join(errors[:5])
+        if len(errors) > 5:
+            preview += f"; ... and {len(errors) - 5} more"
+        super().__init__(f"Schema validation failed for key {custom_id}: {preview}")
+
+
+def _type_name(value):
+    return type(value).__name__
+
+
+def _is_number(value):
+    # bool is a subclass of int, but mongoose would not store it as a Number
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _parse_number(text):
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    # float() accepts "NaN", "inf" and "1e999", which json.dumps would write as
+    # NaN/Infinity and the server's JSON.parse rejects
+    if not math.isfinite(number):
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def _compile_string(name, required, coerce):
+    def check(obj, prefix, errors, coerced):
+        value = obj.get(name)
+        if value is None:
+            if required:
+                errors.append(f"{prefix}{name}: missing")
+            return
+        if isinstance(value, str):
+            return
+        if coerce and (_is_number(value) or isinstance(value, bool)):
+            obj[name] = str(value).lower() if isinstance(value, bool) else str(value)
+            coerced.append(f"{prefix}{name}")
+            return
+        errors.append(f"{prefix}{name}: expected string, got {_type_name(value)}")
+    return check
+
+
+def _compile_string_array(name, required, coerce):
+    def check(obj, prefix, errors, coerced):
+        value = obj.get(name)
+        if value is None:
+            if required:
+                errors.append(f"{prefix}{name}: missing")
+            return
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                if isinstance(item, str):
+                    continue
+                if coerce and _is_number(item):
+                    value[i] = str(item)
+                    coerced.append(f"{prefix}{name}[{i}]")
+                    continue
+                errors.append(f"{prefix}{name}[{i}]: expected string, got {_type_name(item)}")
+            return
+        if coerce and isinstance(value, str):
+            obj[name] = [value]
+            coerced.append(f"{prefix}{name}")
+            return
+        errors.append(f"{prefix}{name}: expected list of strings, got {_type_name(value)}")
+    return check
+
+
+def _compile_number(name, required, coerce):
+    def check(obj, prefix, errors, coerced):
+        value = obj.get(name)
+        if value is None:
+            if required:
+                errors.append(f"{prefix}{name}: missing")
+            return
+        if _is_number(value):
+            # json.loads accepts bare NaN/Infinity; JSON.parse on the server does not
+            if isinstance(value, float) and not math.isfinite(value):
+                errors.append(f"{prefix}{name}: expected finite number, got {value}")
+            return
+        if coerce and isinstance(value, str):
+            number = _parse_number(value.strip())
+            if number is not None:
+                obj[name] = number
+                coerced.append(f"{prefix}{name}")
+                return
+        errors.append(f"{prefix}{name}: expected number, got {_type_name(value)}")
+    return check
+
+
+def _compile_boolean(name, required, coerce):
+    def check(obj, prefix, errors, coerced):
+        value = obj.get(name)
+        if value is None:
+            if required:
+                errors.append(f"{prefix}{name}: missing")
+            return
+        if isinstance(value, bool):
+            return
+        if coerce and isinstance(value, str) and value.strip().lower() in ("true", "false"):
+            obj[name] = value.strip().lower() == "true"
+            coerced.append(f"{prefix}{name}")
+            return
+        errors.append(f"{prefix}{name}: expected boolean, got {_type_name(value)}")
+    return check
+
+
+def _compile_subdocument_array(name, fields, required, coerce):
+    check_item = _compile_object(fields, coerce)
+
+    def check(obj, prefix, errors, coerced):
+        value = obj.get(name)
+        if value is None:
+            if required:
+                errors.append(f"{prefix}{name}: missing")
+            return
+        if not isinstance(value, list):
+            errors.append(f"{prefix}{name}: expected list, got {_type_name(value)}")
+            return
+        for i, item in enumerate(value):
+            item_prefix = f"{prefix}{name}[{i}]."
+            if not isinstance(item, dict):
+                errors.append(f"{item_prefix[:-1]}: expected object, got {_type_name(item)}")
+                continue
+            check_item(item, item_prefix, errors, coerced)
+    return check
+
+
+_SCALAR_COMPILERS = {
+    STRING: _compile_string,
+    STRING_ARRAY: _compile_string_array,
+    NUMBER: _compile_number,
+    BOOLEAN: _compile_boolean,
+}
+
+
+def _compile_object(fields, coerce):
+    """Compile a tuple of field definitions into a single object check."""
+    checks = []
+    for name, kind in fields:
+        required = name in REQUIRED_FIELDS
+        if isinstance(kind, tuple):
+            checks.append(_compile_subdocument_array(name, kind, required, coerce))
+        else:
+            checks.append(_SCALAR_COMPILERS[kind](name, required, coerce))
+    checks = tuple(checks)
+
+    def check(obj, prefix, errors, coerced):
+        for field_check in checks:
+            field_check(obj, prefix, errors, coerced)
+    return check
+
+
+def compile_photo_validator(coerce=False):
+    """
+    Compile a validator for parsed model output.
+
+    Args:
+        coerce: If True, fix values mongoose would otherwise reject or mangle
+            (a bare string where [String] is expected, numeric strings for
+            Number fields, "true"/"false" for Boolean fields). The parsed
+            object is modified in place.
+
+    Returns:
+        A function taking the parsed JSON and returning (errors, coerced), two
+        lists of field paths. The record is valid when errors is empty.
+    """
+    check_photo = _compile_object(PHOTO_FIELDS, coerce)
+
+    def validate(doc):
+        errors = []
+        coerced = []
+        if not isinstance(doc, dict):
+            errors.append(f"root: expected object, got {_type_name(doc)}")
+            return errors, coerced
+        check_photo(doc, "", errors, coerced)
+        return errors, coerced
+
+    return validate
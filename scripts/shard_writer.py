@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Write converted JSONL output as size- or record-bounded shards.
+
+/batch/import reads the whole upload into memory, so large converted files
+are split into shards small enough for the server to absorb one at a time.
+Records (lines) are never split across shards. A <stem>_shards.json manifest
+lists every shard with its record and byte count; callers writing into
+server/batch_data should put it elsewhere (manifest_path), since /batch/next
+serves whatever file it finds first.
+
+Shards for output.jsonl are named output_part0001.jsonl, output_part0002.jsonl, ...
+Shards left over from an earlier run for the same output are removed before
+the first new shard is written, so a re-run with fewer shards never leaves
+stale ones behind to be uploaded twice.
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def parse_size(text):
+    """Parse a size like '50MB', '512KB' or '1048576' into bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*", str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {text!r} (expected e.g. 50MB, 512KB, 1048576)")
+    number, unit = match.groups()
+    unit = unit.upper()
+    if unit in ("K", "M", "G"):
+        unit += "B"
+    size = int(float(number) * _SIZE_UNITS[unit])
+    if size <= 0:
+        raise ValueError(f"Size must be positive: {text!r}")
+    return size
+
+
+def size_arg(text):
+    """argparse type for --shard-size."""
+    try:
+        return parse_size(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def positive_int_arg(text):
+    """argparse type for --shard-records."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid integer: {text!r}")
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"Must be a positive integer: {text!r}")
+    return value
+
+
+def shard_manifest_path(output_path):
+    output_path = Path(output_path)
+    return output_path.parent / f"{output_path.stem}_shards.json"
+
+
+def existing_shards(output_path):
+    """Shard files for output_path already on disk (raises if the folder is missing)."""
+    output_path = Path(output_path)
+    pattern = re.compile(re.escape(output_path.stem) + r"_part\d{4,}" + re.escape(output_path.suffix))
+    return sorted(path for path in output_path.parent.iterdir() if pattern.fullmatch(path.name))
+
+
+class ShardedWriter:
+    """
+    File-like writer that rolls over to a new shard before a record would push
+    the current one past max_bytes or max_records.
+
+    Each write() call must be exactly one complete record, newline included.
+    A single record larger than max_bytes gets a shard of its own.
+    """
+
+    def __init__(self, output_path, max_bytes=None, max_records=None, encoding="utf-8", manifest_path=None):
+        if max_bytes is None and max_records is None:
+            raise ValueError("ShardedWriter needs max_bytes and/or max_records")
+        for name, limit in (("max_bytes", max_bytes), ("max_records", max_records)):
+            if limit is not None and limit <= 0:
+                raise ValueError(f"{name} must be positive, got {limit}")
+        self.output_path = Path(output_path)
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.encoding = encoding
+        self.manifest_path = Path(manifest_path) if manifest_path else shard_manifest_path(self.output_path)
+        self.shards = []
+        self._file = None
+        self._bytes = 0
+        self._records = 0
+        for stale in existing_shards(self.output_path):
+            stale.unlink()
+
+    def _shard_path(self, number):
+        return self.output_path.parent / f"{self.output_path.stem}_part{number:04d}{self.output_path.suffix}"
+
+    def _finish_shard(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self.shards[-1].update({"records": self._records, "bytes": self._bytes})
+        self._file = None
+
+    def _start_shard(self):
+        self._finish_shard()
+        path = self._shard_path(len(self.shards) + 1)
+        # Binary mode so the byte count matches what ends up on disk
+        self._file = open(path, "wb")
+        self.shards.append({"file": path.name})
+        self._bytes = 0
+        self._records = 0
+
+    def write(self, record):
+        data = record.encode(self.encoding)
+        if self._file is None or (self._records > 0 and (
+            (self.max_records is not None and self._records >= self.max_records)
+            or (self.max_bytes is not None and self._bytes + len(data) > self.max_bytes)
+        )):
+            self._start_shard()
+        self._file.write(data)
+        self._bytes += len(data)
+        self._records += 1
+
+    def close(self):
+        self._finish_shard()
+        manifest = {
+            "output": self.output_path.name,
+            "max_bytes": self.max_bytes,
+            "max_records": self.max_records,
+            "total_records": sum(shard["records"] for shard in self.shards),
+            "total_bytes": sum(shard["bytes"] for shard in self.shards),
+            "shards": self.shards,
+        }
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,260 @@
+"""
+Tests for convert_gemini_to_chatgpt.py, run against tmp_path folders.
+
+Run from the repository root:
+    python -m pytest scripts
+"""
+
+import json
+
+import pytest
+
+from convert_gemini_to_chatgpt import (
+    convert_file,
+    convert_folder,
+    convert_gemini_to_chatgpt,
+    main,
+    max_substrate_confidence,
+)
+from photo_schema import SchemaValidationError, compile_photo_validator
+
+
+def make_photo(confidence=4, **typeface_overrides):
+    typeface = {"typefaceStyle": ["Sans serif"], "copy": "OPEN", "messageFunction": ["Branding"]}
+    typeface.update(typeface_overrides)
+    return {"substrateCount": 1, "substrates": [{"typefaces": [typeface], "confidence": confidence}]}
+
+
+def gemini_record(key, payload):
+    text = f"```json\n{json.dumps(payload)}\n```"
+    return {"key": key, "response": {"candidates": [{"content": {"parts": [{"text": text}]}}]}}
+
+
+def write_jsonl(path, records):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write((record if isinstance(record, str) else json.dumps(record)) + "\n")
+    return path
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def parsed_content(chatgpt_record):
+    content = chatgpt_record["response"]["body"]["choices"][0]["message"]["content"]
+    assert content.startswith("|||") and content.endswith("|||")
+    return json.loads(content[3:-3])
+
+
+def test_converter_raises_schema_error_and_rewrites_coerced_json():
+    record = gemini_record("SantaAna40.JPG", make_photo(messageFunction="Branding"))
+    with pytest.raises(SchemaValidationError) as excinfo:
+        convert_gemini_to_chatgpt(record, validator=compile_photo_validator())
+    assert excinfo.value.custom_id == "SantaAna40.JPG"
+
+    converted = convert_gemini_to_chatgpt(record, validator=compile_photo_validator(coerce=True))
+    content = converted["response"]["body"]["choices"][0]["message"]["content"]
+    assert json.loads(content[3:-3])["substrates"][0]["typefaces"][0]["messageFunction"] == ["Branding"]
+
+
+def test_convert_file_writes_schema_rejects_next_to_output(tmp_path):
+    input_path = write_jsonl(tmp_path / "in" / "batch.jsonl", [
+        gemini_record("good.JPG", make_photo()),
+        gemini_record("fixable.JPG", make_photo(messageFunction="Branding")),
+        gemini_record("broken.JPG", {"substrates": "none"}),
+        "not json",
+    ])
+    output_path = tmp_path / "out" / "batch_chatgpt.jsonl"
+    output_path.parent.mkdir()
+
+    processed, errors, skipped = convert_file(input_path, output_path, validate=True)
+
+    assert (processed, errors, skipped) == (1, 3, 0)
+    assert [r["custom_id"] for r in read_jsonl(output_path)] == ["good.JPG"]
+    rejects_path = tmp_path / "out" / "batch_chatgpt_meta" / "batch_chatgpt_rejects.jsonl"
+    rejects = read_jsonl(rejects_path)
+    assert [(r["line"], r["custom_id"]) for r in rejects] == [(2, "fixable.JPG"), (3, "broken.JPG")]
+    assert rejects[1]["errors"] == ["substrates: expected list, got str"]
+    assert rejects[1]["record"]["key"] == "broken.JPG"
+    # Nothing but the converted file lands in the output folder
+    assert sorted(p.name for p in output_path.parent.iterdir()) == ["batch_chatgpt.jsonl", "batch_chatgpt_meta"]
+
+
+def test_convert_file_coerce_keeps_fixable_records(tmp_path):
+    input_path = write_jsonl(tmp_path / "batch.jsonl", [
+        gemini_record("fixable.JPG", make_photo(confidence="5", messageFunction="Branding")),
+        gemini_record("broken.JPG", make_photo(confidence="NaN")),
+    ])
+    rejects_path = tmp_path / "rejects.jsonl"
+
+    processed, errors, _ = convert_file(input_path, coerce=True, rejects_path=rejects_path)
+
+    assert (processed, errors) == (1, 1)
+    [record] = read_jsonl(tmp_path / "batch_chatgpt.jsonl")
+    substrate = parsed_content(record)["substrates"][0]
+    assert substrate["confidence"] == 5
+    assert substrate["typefaces"][0]["messageFunction"] == ["Branding"]
+    assert [r["custom_id"] for r in read_jsonl(rejects_path)] == ["broken.JPG"]
+    assert not (tmp_path / "batch_chatgpt_meta").exists()
+
+
+def test_convert_file_without_rejects_creates_no_meta_folder(tmp_path):
+    input_path = write_jsonl(tmp_path / "batch.jsonl", [gemini_record("good.JPG", make_photo())])
+    assert convert_file(input_path, validate=True) == (1, 0, 0)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["batch.jsonl", "batch_chatgpt.jsonl"]
+
+
+def test_convert_folder_writes_rejects_to_meta_folder(tmp_path):
+    write_jsonl(tmp_path / "in" / "a.jsonl", [gemini_record("a.JPG", {"substrates": [{}]})])
+    write_jsonl(tmp_path / "in" / "b.jsonl", [gemini_record("b.JPG", make_photo())])
+
+    convert_folder(tmp_path / "in", tmp_path / "out", validate=True)
+
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["a_chatgpt.jsonl", "b_chatgpt.jsonl"]
+    [reject] = read_jsonl(tmp_path / "out_meta" / "a_chatgpt_rejects.jsonl")
+    assert reject["errors"] == ["substrates[0].typefaces: missing"]
+
+
+def test_max_substrate_confidence():
+    payload = make_photo(confidence=4)
+    payload["substrates"].append({"typefaces": [], "confidence": 5})
+    assert max_substrate_confidence(convert_gemini_to_chatgpt(gemini_record("a", payload))) == 5
+    assert max_substrate_confidence(convert_gemini_to_chatgpt(gemini_record("a", {"substrates": []}))) is None
+    assert max_substrate_confidence(convert_gemini_to_chatgpt(gemini_record("a", [1, 2]))) is None
+
+
+def write_rerun_batches(folder):
+    """Three batch files where X, Y, W and Z were re-run; keyless records are unrelated."""
+    broken = {"key": "Z.JPG", "response": {"candidates": [{"content": {"parts": [{"text": "```json\n{oops\n```"}]}}]}}
+    write_jsonl(folder / "batch_1.jsonl", [
+        gemini_record("X.JPG", make_photo(confidence=3)),
+        gemini_record("Y.JPG", make_photo(confidence=5)),
+        gemini_record("W.JPG", make_photo(confidence=4)),
+        gemini_record("", make_photo(confidence=1)),
+    ])
+    write_jsonl(folder / "batch_2.jsonl", [
+        gemini_record("x.jpg", make_photo(confidence=5)),
+        broken,
+        {"response": gemini_record("", make_photo(confidence=2))["response"]},
+    ])
+    write_jsonl(folder / "batch_3.jsonl", [
+        gemini_record("X.JPG", make_photo(confidence=4)),
+        gemini_record("Y.JPG", make_photo(confidence=2)),
+        gemini_record("W.JPG", make_photo(confidence=4)),
+        gemini_record("Z.JPG", make_photo(confidence=1)),
+    ])
+
+
+def merged_output(output_folder):
+    """(file, custom_id, confidence) of every emitted record."""
+    return sorted(
+        (path.name.split("_chatgpt")[0], record["custom_id"], parsed_content(record)["substrates"][0]["confidence"])
+        for path in output_folder.glob("*.jsonl")
+        for record in read_jsonl(path)
+    )
+
+
+@pytest.mark.parametrize("policy, kept", [
+    ("first", [("batch_1", "W.JPG", 4), ("batch_1", "X.JPG", 3), ("batch_1", "Y.JPG", 5), ("batch_3", "Z.JPG", 1)]),
+    ("last", [("batch_3", "W.JPG", 4), ("batch_3", "X.JPG", 4), ("batch_3", "Y.JPG", 2), ("batch_3", "Z.JPG", 1)]),
+    # Ties keep the earlier record; the broken Z in batch_2 never wins
+    ("confidence", [("batch_1", "W.JPG", 4), ("batch_1", "Y.JPG", 5), ("batch_2", "x.jpg", 5),
+                    ("batch_3", "Z.JPG", 1)]),
+])
+def test_convert_folder_merge_policies(tmp_path, policy, kept):
+    write_rerun_batches(tmp_path / "in")
+
+    convert_folder(tmp_path / "in", tmp_path / "out", merge=policy)
+
+    output = merged_output(tmp_path / "out")
+    # Keyless records are never treated as duplicates of each other
+    assert [row for row in output if row[1]] == kept
+    assert sorted(row[2] for row in output if not row[1]) == [1, 2]
+    dropped = read_jsonl(tmp_path / "out_meta" / "duplicates_dropped.jsonl")
+    # Under "first" the broken Z is a conversion error; the two-pass policies
+    # already know a later Z wins and drop it unconverted
+    assert len(dropped) == (4 if policy == "first" else 5)
+    assert all(entry["custom_id"] for entry in dropped)
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [
+        "batch_1_chatgpt.jsonl", "batch_2_chatgpt.jsonl", "batch_3_chatgpt.jsonl",
+    ]
+
+
+def test_merge_duplicate_report_points_at_kept_record(tmp_path):
+    write_rerun_batches(tmp_path / "in")
+
+    convert_folder(tmp_path / "in", tmp_path / "out", merge="last")
+
+    dropped = read_jsonl(tmp_path / "out_meta" / "duplicates_dropped.jsonl")
+    assert {"custom_id": "x.jpg", "file": "batch_2.jsonl", "line": 1,
+            "kept_file": "batch_3.jsonl", "kept_line": 1} in dropped
+
+
+@pytest.mark.parametrize("policy, kept", [
+    ("first", [("A.JPG", 3), ("B.JPG", 1)]),
+    ("last", [("B.JPG", 1), ("a.jpg", 2)]),
+    ("confidence", [("B.JPG", 1), ("a.JPG", 5)]),
+])
+def test_merge_within_a_single_file(tmp_path, policy, kept):
+    input_path = write_jsonl(tmp_path / "batch.jsonl", [
+        gemini_record("A.JPG", make_photo(confidence=3)),
+        gemini_record("a.JPG", make_photo(confidence=5)),
+        gemini_record("B.JPG", make_photo(confidence=1)),
+        gemini_record("a.jpg", make_photo(confidence=2)),
+    ])
+
+    main([str(input_path), "--merge", policy])
+
+    records = read_jsonl(tmp_path / "batch_chatgpt.jsonl")
+    assert sorted((r["custom_id"], parsed_content(r)["substrates"][0]["confidence"]) for r in records) == kept
+    dropped = read_jsonl(tmp_path / "batch_chatgpt_meta" / "duplicates_dropped.jsonl")
+    assert len(dropped) == 2
+    assert {entry["file"] for entry in dropped} == {"batch.jsonl"}
+
+
+def test_rejects_option_is_refused_for_folder_input(tmp_path, capsys):
+    (tmp_path / "in").mkdir()
+    with pytest.raises(SystemExit) as excinfo:
+        main([str(tmp_path / "in"), "--rejects", str(tmp_path / "rejects.jsonl")])
+    assert excinfo.value.code == 2
+    assert "--rejects only applies to single file input" in capsys.readouterr().err
+
+
+def test_sharded_rerun_removes_stale_outputs(tmp_path):
+    input_path = write_jsonl(tmp_path / "in" / "b.jsonl", [gemini_record(f"{i}.JPG", make_photo()) for i in range(3)])
+    out = tmp_path / "out"
+    out.mkdir()
+
+    convert_file(input_path, out / "b.jsonl")
+    convert_file(input_path, out / "b.jsonl", shard_records=1)
+    assert sorted(p.name for p in out.iterdir()) == [
+        "b_meta", "b_part0001.jsonl", "b_part0002.jsonl", "b_part0003.jsonl",
+    ]
+
+    convert_file(input_path, out / "b.jsonl", shard_records=5)
+    assert sorted(p.name for p in out.iterdir()) == ["b_meta", "b_part0001.jsonl"]
+    manifest = json.loads((out / "b_meta" / "b_shards.json").read_text())
+    assert [shard["file"] for shard in manifest["shards"]] == ["b_part0001.jsonl"]
+
+    convert_file(input_path, out / "b.jsonl")
+    assert sorted(p.name for p in out.iterdir()) == ["b.jsonl", "b_meta"]
+    assert list((out / "b_meta").iterdir()) == []
+
+
+@pytest.mark.parametrize("shard_options", [{}, {"shard_records": 2}])
+def test_missing_output_folder_is_fatal(tmp_path, capsys, shard_options):
+    input_path = write_jsonl(tmp_path / "b.jsonl", [gemini_record("a.JPG", make_photo())])
+    with pytest.raises(FileNotFoundError):
+        convert_file(input_path, tmp_path / "missing" / "b.jsonl", **shard_options)
+    assert "Unexpected error" not in capsys.readouterr().err
+    assert not (tmp_path / "missing").exists()
+
+
+def test_cli_exits_non_zero_when_shards_cannot_be_written(tmp_path):
+    input_path = write_jsonl(tmp_path / "b.jsonl", [gemini_record("a.JPG", make_photo())])
+    with pytest.raises(SystemExit) as excinfo:
+        main([str(input_path), "-o", str(tmp_path / "missing" / "b.jsonl"), "--shard-records", "2"])
+    assert excinfo.value.code == 1
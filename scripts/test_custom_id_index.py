@@ -0,0 +1,57 @@
+"""
+Tests for custom_id_index.py.
+
+Run from the repository root:
+    python -m pytest scripts
+"""
+
+import os
+import random
+
+from custom_id_index import CustomIdIndex, custom_id_digest
+
+
+def test_index_is_case_insensitive():
+    with CustomIdIndex() as index:
+        index.put("SantaAna40.JPG", (0, 1, None))
+        assert index.get("santaana40.jpg") == (0, 1, None)
+        index.put("SANTAANA40.jpg", (1, 7, 3.0))
+        assert len(index) == 1
+        assert index.get("SantaAna40.JPG") == (1, 7, 3.0)
+        assert index.get("SantaAna41.JPG") is None
+
+
+def test_digest_is_a_non_zero_64_bit_int():
+    digest = custom_id_digest("SantaAna40.JPG")
+    assert digest == custom_id_digest("SANTAANA40.jpg")
+    assert 0 < digest < 2 ** 64
+
+
+def test_in_memory_table_keeps_entries_across_growth():
+    with CustomIdIndex() as index:
+        for i in range(5000):
+            index.put(f"Photo{i}.JPG", (i % 3, i, None if i % 2 else i / 4))
+        assert not index.spilled
+        assert len(index) == 5000
+        for i in range(5000):
+            assert index.get(f"photo{i}.jpg") == (i % 3, i, None if i % 2 else i / 4)
+        assert index.get("Photo5000.JPG") is None
+
+
+def test_index_spill_matches_in_memory_lookups():
+    rng = random.Random(0)
+    operations = [
+        (f"Photo{rng.randint(0, 300)}.JPG", (rng.randint(0, 5), i, rng.choice([None, float(rng.randint(1, 5))])))
+        for i in range(2000)
+    ]
+    with CustomIdIndex() as memory, CustomIdIndex(max_memory_keys=50) as spilled:
+        for custom_id, entry in operations:
+            memory.put(custom_id, entry)
+            spilled.put(custom_id, entry)
+        assert spilled.spilled and not memory.spilled
+        assert len(spilled) == len(memory)
+        for i in range(310):
+            custom_id = f"photo{i}.jpg"
+            assert spilled.get(custom_id) == memory.get(custom_id)
+        db_path = spilled._db_path
+    assert not os.path.exists(db_path)
@@ -0,0 +1,45 @@
+"""
+Tests for the BK-tree and grouping in find_duplicate_images.py (no Pillow needed).
+
+Run from the repository root:
+    python -m pytest scripts
+"""
+
+import random
+
+from find_duplicate_images import BKTree, find_duplicate_groups, hamming
+
+
+def test_bktree_search_matches_brute_force():
+    rng = random.Random(1)
+    hashes = [rng.getrandbits(64) for _ in range(300)]
+    # Near copies of some hashes, one to six bits flipped
+    for value in hashes[:50]:
+        for bit in rng.sample(range(64), rng.randint(1, 6)):
+            value ^= 1 << bit
+        hashes.append(value)
+    hashes.append(hashes[0])  # exact duplicate lands in the same node
+
+    tree = BKTree()
+    for i, value in enumerate(hashes):
+        tree.add(value, i)
+    for query in hashes[:20] + [rng.getrandbits(64) for _ in range(20)]:
+        for max_distance in (0, 3, 6, 20):
+            expected = {(i, hamming(query, value)) for i, value in enumerate(hashes)
+                        if hamming(query, value) <= max_distance}
+            assert set(tree.search(query, max_distance)) == expected
+
+
+def test_bktree_empty_search():
+    assert list(BKTree().search(0, 64)) == []
+
+
+def test_find_duplicate_groups_requires_both_hashes_close():
+    hashes = {
+        "a.jpg": (0b1111, 0b1010),
+        "b.JPG": (0b1110, 0b1011),  # 1 bit from a in both hashes
+        "c.jpg": (0b1111 ^ (0xFF << 8), 0b1010),  # dHash equal, aHash 8 bits off
+        "d.jpg": (0xFFFF << 40, 0xFFFF << 40),
+    }
+    assert find_duplicate_groups(hashes, max_distance=2) == [["a.jpg", "b.JPG"]]
+    assert find_duplicate_groups(hashes, max_distance=8) == [["a.jpg", "b.JPG", "c.jpg"]]
@@ -0,0 +1,59 @@
+"""
+Tests for find_duplicate_texts.py, with MongoDB replaced by in-memory photos.
+
+Run from the repository root:
+    python -m pytest scripts
+"""
+
+import pytest
+
+import find_duplicate_texts
+from find_duplicate_texts import extract_substrate_occurrences, get_substrate_fingerprint
+
+
+def photo(custom_id, *copy_sets):
+    return {
+        "id": custom_id,
+        "custom_id": custom_id,
+        "municipality": "Stanton",
+        "substrates": [{"typefaces": [{"copy": copy} for copy in copies]} for copies in copy_sets],
+    }
+
+
+PHOTOS = [
+    photo("a.jpg", ["OPEN", "  "], ["Pull down\nhandle"]),
+    photo("b.jpg", ["OPEN"], ["Pull  down handle"]),
+    photo("c.jpg", ["OPEN", "\t"]),
+]
+
+
+def test_default_matching_collapses_whitespace_and_drops_blank_copy():
+    occurrences = extract_substrate_occurrences(PHOTOS)
+    assert get_substrate_fingerprint(["OPEN", "  "]) == get_substrate_fingerprint(["OPEN"])
+    counts = sorted(len(occs) for occs in occurrences.values())
+    assert counts == [2, 3]
+
+
+@pytest.fixture
+def run_main(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(find_duplicate_texts, "load_photos_from_mongodb", lambda: PHOTOS)
+
+    def run(*argv):
+        output = tmp_path / "report.md"
+        assert find_duplicate_texts.main([*argv, "-o", str(output)]) == 0
+        return output.read_text(encoding="utf-8"), capsys.readouterr().out
+    return run
+
+
+def test_exact_counts_whitespace_only_copy(run_main):
+    report, out = run_main("--exact")
+    # "OPEN" + blank matches across a and c; "OPEN" alone and the handles differ
+    assert "Found **1** duplicate substrate(s)" in report
+    assert "## [2 occurrences] Substrate with 2 typeface(s)" in report
+    assert "steps: strip)" in out
+
+
+def test_summary_reports_normalizations_and_lookups(run_main):
+    report, out = run_main()
+    assert "Found **2** duplicate substrate(s)" in report
+    assert "Ran 5 normalization(s) for 7 lookup(s) (cache hit rate 28.6%, steps: whitespace)" in out
@@ -0,0 +1,103 @@
+"""
+Tests for photo_schema.py.
+
+Run from the repository root:
+    python -m pytest scripts
+"""
+
+import json
+
+import pytest
+
+from photo_schema import compile_photo_validator
+
+
+def make_photo(**typeface_overrides):
+    typeface = {
+        "typefaceStyle": ["Sans serif"],
+        "copy": "OPEN",
+        "letteringOntology": ["Printed"],
+        "messageFunction": ["Branding"],
+        "covidRelated": False,
+        "additionalNotes": "",
+    }
+    typeface.update(typeface_overrides)
+    return {
+        "substrateCount": 1,
+        "substrates": [{"placement": "Window", "typefaces": [typeface], "confidence": 4}],
+    }
+
+
+def test_valid_photo_has_no_errors():
+    assert compile_photo_validator()(make_photo()) == ([], [])
+
+
+def test_missing_required_fields():
+    validate = compile_photo_validator()
+    errors, _ = validate({"substrateCount": 1})
+    assert errors == ["substrates: missing"]
+    errors, _ = validate({"substrates": [{"placement": "Window"}]})
+    assert errors == ["substrates[0].typefaces: missing"]
+
+
+def test_string_for_string_array_is_rejected_without_coerce():
+    doc = make_photo(messageFunction="Branding")
+    errors, coerced = compile_photo_validator()(doc)
+    assert errors == ["substrates[0].typefaces[0].messageFunction: expected list of strings, got str"]
+    assert coerced == []
+    assert doc["substrates"][0]["typefaces"][0]["messageFunction"] == "Branding"
+
+
+def test_coerce_fixes_coercible_values_in_place():
+    doc = make_photo(messageFunction="Branding", typefaceStyle=["Serif", 3], covidRelated="TRUE")
+    doc["substrates"][0]["confidence"] = "4.5"
+    errors, coerced = compile_photo_validator(coerce=True)(doc)
+    assert errors == []
+    assert sorted(coerced) == [
+        "substrates[0].confidence",
+        "substrates[0].typefaces[0].covidRelated",
+        "substrates[0].typefaces[0].messageFunction",
+        "substrates[0].typefaces[0].typefaceStyle[1]",
+    ]
+    typeface = doc["substrates"][0]["typefaces"][0]
+    assert typeface["messageFunction"] == ["Branding"]
+    assert typeface["typefaceStyle"] == ["Serif", "3"]
+    assert typeface["covidRelated"] is True
+    assert doc["substrates"][0]["confidence"] == 4.5
+
+
+def test_coerce_leaves_uncoercible_values_as_errors():
+    doc = make_photo(covidRelated="maybe")
+    doc["substrates"][0]["confidence"] = True  # bool is not a Number
+    errors, _ = compile_photo_validator(coerce=True)(doc)
+    assert errors == [
+        "substrates[0].typefaces[0].covidRelated: expected boolean, got str",
+        "substrates[0].confidence: expected number, got bool",
+    ]
+
+
+def test_non_object_payloads():
+    validate = compile_photo_validator()
+    assert validate([1, 2])[0] == ["root: expected object, got list"]
+    errors, _ = validate({"substrates": ["nope"]})
+    assert errors == ["substrates[0]: expected object, got str"]
+
+
+@pytest.mark.parametrize("text", ["NaN", "nan", "inf", "-Infinity", "1e999"])
+def test_coerce_rejects_non_finite_numbers(text):
+    doc = make_photo()
+    doc["substrates"][0]["confidence"] = text
+    errors, coerced = compile_photo_validator(coerce=True)(doc)
+    assert errors == ["substrates[0].confidence: expected number, got str"]
+    assert coerced == []
+    assert doc["substrates"][0]["confidence"] == text
+
+
+def test_non_finite_json_numbers_are_errors():
+    # json.loads accepts these literals, the server's JSON.parse does not
+    doc = json.loads('{"substrateCount": Infinity, "substrates": [{"typefaces": [], "confidence": NaN}]}')
+    errors, _ = compile_photo_validator(coerce=True)(doc)
+    assert errors == [
+        "substrateCount: expected finite number, got inf",
+        "substrates[0].confidence: expected finite number, got nan",
+    ]
@@ -0,0 +1,107 @@
+"""
+Tests for shard_writer.py.
+
+Run from the repository root:
+    python -m pytest scripts
+"""
+
+import argparse
+import json
+
+import pytest
+
+from shard_writer import ShardedWriter, existing_shards, parse_size, positive_int_arg, size_arg
+
+
+def read_shards(tmp_path, writer):
+    return [(tmp_path / shard["file"]).read_text(encoding="utf-8") for shard in writer.shards]
+
+
+def test_shards_roll_over_at_record_limit(tmp_path):
+    records = [f'{{"n": {i}}}\n' for i in range(7)]
+    with ShardedWriter(tmp_path / "out.jsonl", max_records=3) as writer:
+        for record in records:
+            writer.write(record)
+    assert [shard["records"] for shard in writer.shards] == [3, 3, 1]
+    assert "".join(read_shards(tmp_path, writer)) == "".join(records)
+    manifest = json.loads((tmp_path / "out_shards.json").read_text())
+    assert manifest["total_records"] == 7
+    assert [shard["file"] for shard in manifest["shards"]] == [
+        "out_part0001.jsonl", "out_part0002.jsonl", "out_part0003.jsonl",
+    ]
+
+
+def test_shards_roll_over_at_byte_limit_without_splitting_records(tmp_path):
+    # 10-byte records: two fit exactly in 20 bytes, a third rolls over
+    records = ["123456789\n"] * 5 + ["x" * 49 + "\n"] + ["123456789\n"]
+    with ShardedWriter(tmp_path / "out.jsonl", max_bytes=20) as writer:
+        for record in records:
+            writer.write(record)
+    # The 50-byte record exceeds the limit and gets a shard of its own
+    assert [shard["bytes"] for shard in writer.shards] == [20, 20, 10, 50, 10]
+    contents = read_shards(tmp_path, writer)
+    assert "".join(contents) == "".join(records)
+    assert all(content.endswith("\n") for content in contents)
+
+
+def test_shard_byte_limit_counts_encoded_bytes(tmp_path):
+    with ShardedWriter(tmp_path / "out.jsonl", max_bytes=8) as writer:
+        writer.write("⟶⟶\n")  # 7 bytes in UTF-8
+        writer.write("a\n")
+    assert [shard["bytes"] for shard in writer.shards] == [7, 2]
+
+
+def test_shard_manifest_path_override(tmp_path):
+    manifest_path = tmp_path / "meta" / "out_shards.json"
+    with ShardedWriter(tmp_path / "out.jsonl", max_records=1, manifest_path=manifest_path) as writer:
+        writer.write("{}\n")
+    assert manifest_path.exists()
+    assert not (tmp_path / "out_shards.json").exists()
+
+
+@pytest.mark.parametrize("limits", [{}, {"max_records": 0}, {"max_records": -1}, {"max_bytes": 0}])
+def test_sharded_writer_rejects_bad_limits(tmp_path, limits):
+    with pytest.raises(ValueError):
+        ShardedWriter(tmp_path / "out.jsonl", **limits)
+
+
+def test_parse_size():
+    assert parse_size("1048576") == 1048576
+    assert parse_size("512KB") == 512 * 1024
+    assert parse_size("50mb") == 50 * 1024 ** 2
+    assert parse_size("1.5G") == int(1.5 * 1024 ** 3)
+    for bad in ("5XB", "", "0", "-1MB"):
+        with pytest.raises(ValueError):
+            parse_size(bad)
+
+
+def test_cli_arg_types_raise_argument_type_errors():
+    assert size_arg("1KB") == 1024
+    assert positive_int_arg("5000") == 5000
+    for arg_type, bad in ((size_arg, "5XB"), (positive_int_arg, "0"), (positive_int_arg, "-2"),
+                          (positive_int_arg, "ten")):
+        with pytest.raises(argparse.ArgumentTypeError):
+            arg_type(bad)
+
+
+def test_stale_shards_are_removed_before_writing(tmp_path):
+    for name in ("out_part0001.jsonl", "out_part0002.jsonl", "out_part0010.jsonl",
+                 "out_part0001.jsonl.bak", "outer_part0001.jsonl", "out.jsonl"):
+        (tmp_path / name).write_text("old\n")
+    assert [p.name for p in existing_shards(tmp_path / "out.jsonl")] == [
+        "out_part0001.jsonl", "out_part0002.jsonl", "out_part0010.jsonl",
+    ]
+
+    with ShardedWriter(tmp_path / "out.jsonl", max_records=5) as writer:
+        writer.write("{}\n")
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "out.jsonl", "out_part0001.jsonl", "out_part0001.jsonl.bak", "out_shards.json", "outer_part0001.jsonl",
+    ]
+    assert (tmp_path / "out_part0001.jsonl").read_text() == "{}\n"
+
+
+def test_missing_output_folder_fails_on_open(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ShardedWriter(tmp_path / "missing" / "out.jsonl", max_records=5)
+
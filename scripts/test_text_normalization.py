@@ -0,0 +1,43 @@
+"""
+Tests for text_normalization.py.
+
+Run from the repository root:
+    python -m pytest scripts
+"""
+
+import argparse
+
+import pytest
+
+from text_normalization import EXACT_STEPS, TextNormalizer, parse_steps, steps_arg
+
+
+def test_normalizer_steps_and_cache_stats():
+    normalizer = TextNormalizer(parse_steps("nfkc,casefold,placeholders,punctuation"))
+    assert normalizer("  [Illegible text] ⟶ OPEN! ") == "[?] open"
+    assert normalizer("[illegible]") == "[?]"
+    assert normalizer("!!!") is None
+    assert normalizer(None) is None
+    normalizer("[illegible]")
+    stats = normalizer.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+
+
+def test_steps_arg_raises_argument_type_error():
+    with pytest.raises(argparse.ArgumentTypeError, match="available: strip"):
+        steps_arg("foo")
+    with pytest.raises(argparse.ArgumentTypeError):
+        steps_arg(" , ")
+
+
+def test_default_normalizer_collapses_whitespace():
+    assert TextNormalizer()("  Pull down\n handle ") == "Pull down handle"
+    assert TextNormalizer()("   ") is None
+
+
+def test_keep_blank_keeps_whitespace_only_copy():
+    exact = TextNormalizer(EXACT_STEPS, keep_blank=True)
+    assert exact("  Pull down\n handle ") == "Pull down\n handle"
+    assert exact("   ") == ""
+    assert exact("") is None
+    assert exact(None) is None
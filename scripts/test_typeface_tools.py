@@ -0,0 +1,119 @@
+"""
+Tests for typeface_tools.py subcommand dispatch and chaining.
+
+The real subcommands are swapped for fake modules, so nothing here needs
+pymongo or a database.
+
+Run from the repository root:
+    python -m pytest scripts
+"""
+
+import sys
+import types
+
+import pytest
+
+import mongo_client
+import typeface_tools
+from typeface_tools import _split_chain
+
+
+@pytest.fixture
+def fake_commands(monkeypatch):
+    """Register fake subcommands one/two/three; returns (calls, results)."""
+    calls = []
+    results = {}
+
+    def make_module(name):
+        def main(argv):
+            calls.append((name, list(argv), sys.argv[0]))
+            result = results.get(name)
+            if isinstance(result, BaseException):
+                raise result
+            return result
+        module = types.ModuleType(f"fake_{name}")
+        module.main = main
+        return module
+
+    commands = {}
+    for name in ("one", "two", "three"):
+        monkeypatch.setitem(sys.modules, f"fake_{name}", make_module(name))
+        commands[name] = (f"fake_{name}", f"Fake subcommand {name}")
+    monkeypatch.setattr(typeface_tools, "SUBCOMMANDS", commands)
+    return calls, results
+
+
+def test_split_chain_drops_empty_segments():
+    assert _split_chain(["one", "-x", "+", "two", "+", "+", "three", "a+b"]) == [
+        ["one", "-x"], ["two"], ["three", "a+b"],
+    ]
+    assert _split_chain(["+", "one", "+"]) == [["one"]]
+    assert _split_chain([]) == []
+
+
+def test_chained_subcommands_run_in_order(fake_commands):
+    calls, _ = fake_commands
+    saved_prog = sys.argv[0]
+    assert typeface_tools.main(["one", "--flag", "+", "two", "a", "b", "+", "three"]) == 0
+    assert calls == [
+        ("one", ["--flag"], "typeface-tools one"),
+        ("two", ["a", "b"], "typeface-tools two"),
+        ("three", [], "typeface-tools three"),
+    ]
+    assert sys.argv[0] == saved_prog
+
+
+def test_chain_stops_on_non_zero_status(fake_commands, capsys):
+    calls, results = fake_commands
+    results["two"] = 2
+    assert typeface_tools.main(["one", "+", "two", "+", "three"]) == 2
+    assert [name for name, _, _ in calls] == ["one", "two"]
+    assert "'two' exited with status 2; stopping" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("result, status", [
+    (SystemExit(3), 3),
+    (SystemExit(None), 0),
+    (SystemExit("Error: no input"), 1),
+    ("Error: no input", 1),
+])
+def test_exit_styles_map_to_status(fake_commands, capsys, result, status):
+    calls, results = fake_commands
+    results["one"] = result
+    assert typeface_tools.main(["one", "+", "two"]) == status
+    assert len(calls) == (1 if status else 2)
+    if status == 1:
+        assert "Error: no input" in capsys.readouterr().err
+
+
+def test_unknown_chained_subcommand_is_an_error_before_anything_runs(fake_commands, capsys):
+    calls, _ = fake_commands
+    with pytest.raises(SystemExit) as excinfo:
+        typeface_tools.main(["one", "+", "bogus", "--flag"])
+    assert excinfo.value.code == 2
+    assert calls == []
+    assert "unknown subcommand after '+': bogus" in capsys.readouterr().err
+
+
+def test_unknown_first_subcommand_is_an_error(fake_commands, capsys):
+    with pytest.raises(SystemExit) as excinfo:
+        typeface_tools.main(["bogus"])
+    assert excinfo.value.code == 2
+    assert "invalid choice: 'bogus'" in capsys.readouterr().err
+
+
+def test_mongo_options_configure_the_shared_client_once(fake_commands, monkeypatch):
+    calls, _ = fake_commands
+    configured = []
+    monkeypatch.setattr(mongo_client, "configure", lambda **kwargs: configured.append(kwargs))
+    argv = ["--read-preference", "secondaryPreferred", "--max-pool-size", "4", "one", "+", "two"]
+    assert typeface_tools.main(argv) == 0
+    assert configured == [{"timeout_ms": None, "max_pool_size": 4, "read_preference": "secondaryPreferred"}]
+    assert [name for name, _, _ in calls] == ["one", "two"]
+
+
+def test_timing_reports_each_subcommand(fake_commands, capsys):
+    assert typeface_tools.main(["--timing", "one", "+", "two"]) == 0
+    err = capsys.readouterr().err
+    assert "[timing] startup:" in err
+    assert "[timing] one:" in err and "[timing] two:" in err
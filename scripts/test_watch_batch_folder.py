@@ -0,0 +1,176 @@
+"""
+Tests for watch_batch_folder.py, run against tmp_path folders.
+
+Conversions run inline through InlinePool instead of a process pool.
+
+Run from the repository root:
+    python -m pytest scripts
+"""
+
+import json
+import os
+from concurrent.futures import Future
+
+import pytest
+
+import watch_batch_folder
+from watch_batch_folder import FolderWatcher
+
+
+def gemini_line(key):
+    payload = {"substrates": [{"typefaces": [{"copy": "OPEN"}], "confidence": 4}]}
+    text = f"```json\n{json.dumps(payload)}\n```"
+    return json.dumps({"key": key, "response": {"candidates": [{"content": {"parts": [{"text": text}]}}]}}) + "\n"
+
+
+class InlinePool:
+    """Stands in for ProcessPoolExecutor; fail maps file name -> exception to raise."""
+
+    def __init__(self, fail=None):
+        self.fail = fail or {}
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        name = os.path.basename(args[0])
+        self.submitted.append(name)
+        future = Future()
+        if name in self.fail:
+            future.set_exception(self.fail[name])
+        else:
+            future.set_result(fn(*args))
+        return future
+
+
+@pytest.fixture
+def folders(tmp_path):
+    (tmp_path / "in").mkdir()
+    return tmp_path / "in", tmp_path / "out", tmp_path / "out_meta"
+
+
+def make_watcher(folders, **kwargs):
+    input_dir, output_dir, meta_dir = folders
+    return FolderWatcher(input_dir, output_dir, meta_dir, **kwargs)
+
+
+def test_file_is_converted_once_stable(folders):
+    input_dir, output_dir, meta_dir = folders
+    watcher = make_watcher(folders, stable_polls=2)
+    pool = InlinePool()
+    path = input_dir / "batch_1.jsonl"
+    path.write_text(gemini_line("A.JPG"))
+    (input_dir / "batch_2.jsonl.part").write_text(gemini_line("B.JPG"))
+
+    assert watcher.poll(pool) is True
+    assert pool.submitted == []
+    # Still growing: the stability count starts over
+    with open(path, "a") as f:
+        f.write(gemini_line("C.JPG"))
+    os.utime(path, ns=(0, 1))
+    watcher.poll(pool)
+    assert pool.submitted == []
+
+    watcher.poll(pool)
+    assert pool.submitted == ["batch_1.jsonl"]
+    assert watcher.poll(pool) is False
+    assert pool.submitted == ["batch_1.jsonl"]
+    assert sorted(p.name for p in output_dir.iterdir()) == ["batch_1_chatgpt.jsonl"]
+    status = json.loads((meta_dir / "watch_status.json").read_text())
+    assert status["files"]["batch_1.jsonl"]["processed"] == 2
+    assert status["backlog"] == 0
+
+
+def test_changed_file_is_converted_again_and_stale_shards_removed(folders):
+    input_dir, output_dir, _ = folders
+    watcher = make_watcher(folders, stable_polls=1, convert_options={"shard_records": 1})
+    pool = InlinePool()
+    path = input_dir / "batch.jsonl"
+    path.write_text(gemini_line("A.JPG") + gemini_line("B.JPG"))
+    watcher.poll(pool)
+    watcher.poll(pool)
+    assert sorted(p.name for p in output_dir.iterdir()) == [
+        "batch_chatgpt_part0001.jsonl", "batch_chatgpt_part0002.jsonl",
+    ]
+
+    path.write_text(gemini_line("A.JPG"))
+    os.utime(path, ns=(0, 1))
+    watcher.poll(pool)
+    watcher.poll(pool)
+    assert pool.submitted == ["batch.jsonl", "batch.jsonl"]
+    assert sorted(p.name for p in output_dir.iterdir()) == ["batch_chatgpt_part0001.jsonl"]
+
+
+def test_failed_file_is_retried_after_backoff_and_on_restart(folders, monkeypatch):
+    input_dir, output_dir, meta_dir = folders
+    (input_dir / "batch.jsonl").write_text(gemini_line("A.JPG"))
+    clock = [1000.0]
+    monkeypatch.setattr(watch_batch_folder.time, "monotonic", lambda: clock[0])
+
+    watcher = make_watcher(folders, stable_polls=1)
+    failing = InlinePool(fail={"batch.jsonl": RuntimeError("worker died")})
+    watcher.poll(failing)
+    assert watcher.poll(failing) is False
+    entry = watcher.files["batch.jsonl"]
+    assert entry["failed"] and entry["attempts"] == 1
+    assert entry["error"] == "RuntimeError: worker died"
+
+    # Within the backoff the failed file is left alone
+    clock[0] += watch_batch_folder.RETRY_BACKOFF - 1
+    watcher.poll(failing)
+    assert failing.submitted == ["batch.jsonl"]
+    # After it, the file is retried and the backoff doubles
+    clock[0] += 2
+    watcher.poll(failing)
+    watcher.poll(failing)
+    assert failing.submitted == ["batch.jsonl", "batch.jsonl"]
+    assert watcher.files["batch.jsonl"]["attempts"] == 2
+    assert watcher._retry_at["batch.jsonl"] == clock[0] + 2 * watch_batch_folder.RETRY_BACKOFF
+
+    # A restarted watcher retries right away
+    restarted = make_watcher(folders, stable_polls=1)
+    pool = InlinePool()
+    restarted.poll(pool)
+    assert pool.submitted == ["batch.jsonl"]
+    assert restarted.poll(pool) is False
+    assert "failed" not in restarted.files["batch.jsonl"]
+    assert sorted(p.name for p in output_dir.iterdir()) == ["batch_chatgpt.jsonl"]
+    status = json.loads((meta_dir / "watch_status.json").read_text())
+    assert status["files_converted"] == 1
+
+
+def test_interrupted_job_is_not_recorded(folders):
+    input_dir, _, _ = folders
+    (input_dir / "batch.jsonl").write_text(gemini_line("A.JPG"))
+    watcher = make_watcher(folders, stable_polls=1)
+    watcher.poll(InlinePool(fail={"batch.jsonl": KeyboardInterrupt()}))
+
+    # Not recorded as failed, so the next poll converts it again
+    pool = InlinePool()
+    watcher.poll(pool)
+    assert pool.submitted == ["batch.jsonl"]
+    watcher.poll(pool)
+    assert watcher.files_failed == 0
+    assert watcher.files["batch.jsonl"]["processed"] == 1
+
+
+def test_meta_dir_on_another_filesystem_is_refused(folders, monkeypatch):
+    _, _, meta_dir = folders
+    real_stat = os.stat
+
+    def stat(path, *args, **kwargs):
+        result = real_stat(path, *args, **kwargs)
+        if os.fspath(path) == os.fspath(meta_dir):
+            return os.stat_result((*result[:2], result.st_dev + 1, *result[3:]))
+        return result
+
+    monkeypatch.setattr(watch_batch_folder.os, "stat", stat)
+    with pytest.raises(ValueError, match="different filesystem"):
+        make_watcher(folders)
+
+
+def test_run_once_with_process_pool(folders):
+    input_dir, output_dir, _ = folders
+    (input_dir / "batch.jsonl").write_text(gemini_line("A.JPG"))
+    watcher = make_watcher(folders, workers=1, stable_polls=1)
+    watcher.run(interval=0.01, once=True)
+    assert sorted(p.name for p in output_dir.iterdir()) == ["batch_chatgpt.jsonl"]
+    assert watcher.files_converted == 1
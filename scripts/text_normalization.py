@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Configurable, memoized text normalization for substrate fingerprinting.
+
+A TextNormalizer applies a sequence of named steps to a copy string and caches
+the result per raw string in a bounded LRU cache. Copy texts repeat heavily
+across the census ("[illegible]", "OPEN", ...), so most strings are
+normalized only once.
+
+Steps:
+    strip         strip leading/trailing whitespace
+    whitespace    strip and collapse runs of whitespace (incl. newlines) to one space
+    nfkc          Unicode NFKC normalization (full-width forms, ligatures, ...)
+    casefold      case-insensitive comparison
+    punctuation   remove punctuation and symbols (incl. arrows such as ⟶), then
+                  collapse whitespace; "[?]" tokens from an earlier
+                  placeholders step are kept
+    placeholders  replace bracketed placeholders ("[illegible]", "[unreadable text]")
+                  with a single "[?]" token
+
+Usage:
+    normalizer = TextNormalizer(("nfkc", "casefold", "whitespace"))
+    normalizer("  OPEN\\n  Daily ")   # -> "open daily"
+    normalizer.stats()
+"""
+
+import argparse
+import re
+import unicodedata
+from functools import lru_cache
+
+_PLACEHOLDER_RE = re.compile(r"\[[^\[\]]*\]")
+PLACEHOLDER_TOKEN = "[?]"
+
+
+def _strip(text):
+    return text.strip()
+
+
+def _collapse_whitespace(text):
+    return " ".join(text.split())
+
+
+def _nfkc(text):
+    return unicodedata.normalize("NFKC", text)
+
+
+def _casefold(text):
+    return text.casefold()
+
+
+def _strip_punctuation(text):
+    # Unicode categories P* (punctuation) and S* (symbols: arrows, currency, ...);
+    # masked "[?]" placeholders survive, so run "placeholders" before this step
+    parts = [
+        "".join(ch for ch in part if unicodedata.category(ch)[0] not in "PS")
+        for part in text.split(PLACEHOLDER_TOKEN)
+    ]
+    return " ".join(PLACEHOLDER_TOKEN.join(parts).split())
+
+
+def _mask_placeholders(text):
+    return _PLACEHOLDER_RE.sub(PLACEHOLDER_TOKEN, text)
+
+
+STEPS = {
+    "strip": _strip,
+    "whitespace": _collapse_whitespace,
+    "nfkc": _nfkc,
+    "casefold": _casefold,
+    "punctuation": _strip_punctuation,
+    "placeholders": _mask_placeholders,
+}
+
+# Matches the historical normalize_text behaviour of find_duplicate_texts.py
+DEFAULT_STEPS = ("whitespace",)
+# --exact: compare text as written, ignoring only surrounding whitespace; used
+# with keep_blank=True so whitespace-only copy still counts, as it always has
+EXACT_STEPS = ("strip",)
+
+
+def parse_steps(spec):
+    """Parse a comma-separated step list such as 'nfkc,casefold,whitespace'."""
+    steps = tuple(step.strip() for step in spec.split(",") if step.strip())
+    unknown = [step for step in steps if step not in STEPS]
+    if unknown:
+        raise ValueError(f"Unknown normalization step(s): {', '.join(unknown)} (available: {', '.join(STEPS)})")
+    if not steps:
+        raise ValueError("At least one normalization step is required")
+    return steps
+
+
+def steps_arg(spec):
+    """argparse type for --normalize."""
+    try:
+        return parse_steps(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+class TextNormalizer:
+    """
+    Callable normalization pipeline with a bounded LRU cache keyed by the raw string.
+
+    Returns None for non-strings and for strings that normalize to "". With
+    keep_blank=True, a non-empty string that normalizes to "" (whitespace-only
+    copy) gives "" instead, so it still takes part in fingerprints.
+    """
+
+    def __init__(self, steps=DEFAULT_STEPS, cache_size=65536, keep_blank=False):
+        self.steps = tuple(steps)
+        unknown = [step for step in self.steps if step not in STEPS]
+        if unknown:
+            raise ValueError(f"Unknown normalization step(s): {', '.join(unknown)}")
+        functions = tuple(STEPS[step] for step in self.steps)
+
+        def normalize(text):
+            blank = "" if keep_blank and text else None
+            for function in functions:
+                text = function(text)
+            return text or blank
+
+        self._cached = lru_cache(maxsize=cache_size)(normalize)
+
+    def __call__(self, text):
+        if text is None or not isinstance(text, str):
+            return None
+        return self._cached(text)
+
+    def stats(self):
+        """Cache statistics: hits, misses, size, maxsize and hit_rate."""
+        info = self._cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self._cached.cache_clear()
+
+    def __repr__(self):
+        return f"TextNormalizer(steps={self.steps!r})"
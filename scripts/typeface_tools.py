@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the typeface-analyzer scripts.
+
+Each subcommand is the existing script, imported only when it runs, so
+`--help` and argument errors never pay for pymongo or python-dotenv.
+Subcommands can be chained with a standalone "+"; chained commands run in one
+process and share a single MongoDB connection pool (see mongo_client.py).
+
+Examples:
+  python scripts/typeface_tools.py convert downloads/ -o server/batch_data_chatgpt
+  python scripts/typeface_tools.py --read-preference secondaryPreferred \\
+      municipality --pattern '^GardenGrove' --municipality 'Garden Grove' + dedupe
+"""
+
+import sys
+import time
+
+_STARTED = time.perf_counter()
+
+# name -> (module, description); modules live next to this file
+SUBCOMMANDS = {
+    "convert": ("convert_gemini_to_chatgpt", "Convert Gemini batch results JSONL to ChatGPT format"),
+    "watch": ("watch_batch_folder", "Watch a folder and convert new batch results as they land"),
+    "dedupe": ("find_duplicate_texts", "Find duplicate substrates across all photos"),
+    "municipality": ("update_municipality", "Update municipality for photos whose custom_id matches a regex"),
+    "images": ("find_duplicate_images", "Find duplicate photos in a local folder by perceptual hash"),
+}
+
+CHAIN_SEPARATOR = "+"
+
+
+def _split_chain(argv):
+    chain = [[]]
+    for arg in argv:
+        if arg == CHAIN_SEPARATOR:
+            chain.append([])
+        else:
+            chain[-1].append(arg)
+    return [segment for segment in chain if segment]
+
+
+def build_parser():
+    import argparse
+
+    from mongo_client import READ_PREFERENCES
+
+    commands = "\n".join(f"  {name:<14}{description}" for name, (_, description) in SUBCOMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog="typeface-tools",
+        description="Run typeface-analyzer scripts. Chain subcommands with a standalone '+'.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"Subcommands:\n{commands}\n\nRun 'typeface-tools <subcommand> --help' for subcommand options.",
+    )
+    parser.add_argument('--timeout-ms', type=int, help='MongoDB server selection and connect timeout')
+    parser.add_argument('--max-pool-size', type=int, help='MongoDB connection pool size')
+    parser.add_argument(
+        '--read-preference',
+        choices=READ_PREFERENCES,
+        help='MongoDB read preference'
+    )
+    parser.add_argument('--timing', action='store_true', help='Print startup and per-subcommand timings to stderr')
+    parser.add_argument('command', choices=sorted(SUBCOMMANDS), metavar='subcommand', help='One of: %(choices)s')
+    parser.add_argument('args', nargs='...', help='Subcommand arguments')
+    return parser
+
+
+def run_subcommand(name, argv):
+    """Import and run one subcommand; returns its exit status."""
+    import importlib
+
+    module = importlib.import_module(SUBCOMMANDS[name][0])
+    # The scripts' parsers take their prog name from sys.argv[0]
+    saved_prog = sys.argv[0]
+    sys.argv[0] = f"typeface-tools {name}"
+    try:
+        result = module.main(argv)
+    except SystemExit as e:
+        result = e.code
+    finally:
+        sys.argv[0] = saved_prog
+    if result is None:
+        return 0
+    if isinstance(result, int):
+        return result
+    # sys.exit("message") style
+    print(result, file=sys.stderr)
+    return 1
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    chain = _split_chain(argv)
+    if not chain:
+        chain = [["--help"]]
+
+    parser = build_parser()
+    first = parser.parse_args(chain[0])
+    steps = [(first.command, first.args)]
+    for segment in chain[1:]:
+        if segment[0] not in SUBCOMMANDS:
+            parser.error(f"unknown subcommand after '{CHAIN_SEPARATOR}': {segment[0]}")
+        steps.append((segment[0], segment[1:]))
+
+    if first.timeout_ms or first.max_pool_size or first.read_preference:
+        from mongo_client import configure
+
+        configure(
+            timeout_ms=first.timeout_ms,
+            max_pool_size=first.max_pool_size,
+            read_preference=first.read_preference,
+        )
+
+    if first.timing:
+        print(f"[timing] startup: {(time.perf_counter() - _STARTED) * 1000:.1f} ms", file=sys.stderr)
+
+    for name, args in steps:
+        started = time.perf_counter()
+        status = run_subcommand(name, args)
+        if first.timing:
+            print(f"[timing] {name}: {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+        if status:
+            print(f"typeface-tools: '{name}' exited with status {status}; stopping", file=sys.stderr)
+            return status
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,11 +6,9 @@ This script updates all photos in the database where custom_id matches the patte
 '^SantaAna' to set their municipality field to 'Santa Ana'.
 """
 
-import os
 import sys
-import re
-from pymongo import MongoClient
-from dotenv import load_dotenv
+
+from mongo_client import DATABASE_NAME, PHOTOS_COLLECTION, get_photos_collection
 
 
 def update_municipality_by_regex(pattern, new_municipality, dry_run=False):
@@ -25,26 +23,12 @@ def update_municipality_by_regex(pattern, new_municipality, dry_run=False):
     Returns:
         tuple: (matched_count, updated_count)
     """
-    # Load environment variables from .env file
-    # Script is in scripts/ folder, so go up one level to find server/.env
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(script_dir)
-    env_path = os.path.join(project_root, 'server', '.env')
-    load_dotenv(env_path)
-    
-    # Get MongoDB connection URI
-    mongodb_uri = os.getenv('MONGODB_URI')
-    if not mongodb_uri:
-        raise ValueError("MONGODB_URI not found in environment variables. Please check your .env file.")
-    
-    # Connect to MongoDB
+    # Connect to MongoDB (shared client; closed when the process exits)
     try:
-        client = MongoClient(mongodb_uri)
-        db = client['visualTextDB']
-        photos_collection = db['photos']
+        photos_collection = get_photos_collection()
         
-        print(f"Connected to MongoDB database: visualTextDB")
-        print(f"Collection: photos")
+        print(f"Connected to MongoDB database: {DATABASE_NAME}")
+        print(f"Collection: {PHOTOS_COLLECTION}")
         print()
         
         # Build the query using regex
@@ -56,7 +40,6 @@ def update_municipality_by_regex(pattern, new_municipality, dry_run=False):
         
         if matched_count == 0:
             print("No documents to update.")
-            client.close()
             return (0, 0)
         
         # Show some examples of what will be updated
@@ -74,7 +57,6 @@ def update_municipality_by_regex(pattern, new_municipality, dry_run=False):
         if dry_run:
             print("DRY RUN MODE - No changes will be made")
             print(f"Would update {matched_count} document(s) to municipality: '{new_municipality}'")
-            client.close()
             return (matched_count, 0)
         
         # Perform the update
@@ -92,7 +74,6 @@ def update_municipality_by_regex(pattern, new_municipality, dry_run=False):
         if updated_count < matched_count:
             print(f"  Note: {matched_count - updated_count} document(s) may have already had this municipality value.")
         
-        client.close()
         return (matched_count, updated_count)
         
     except Exception as e:
@@ -100,7 +81,7 @@ def update_municipality_by_regex(pattern, new_municipality, dry_run=False):
         raise
 
 
-def main():
+def main(argv=None):
     """Main function to run the script."""
     import argparse
     
@@ -138,7 +119,7 @@ Examples:
         help='Show what would be updated without making changes'
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Get pattern and municipality - prompt if not provided
     pattern = args.pattern
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Watch a folder of downloaded Gemini batch results and convert new files as they land.
+
+Polls the input folder for *.jsonl files. A file is converted once its size and
+mtime have stayed the same for --stable-polls consecutive polls, so files that
+are still downloading are left alone, and files renamed into place are picked up
+on the following polls. Files that change after conversion are converted again.
+
+Conversion runs in a bounded process pool. Output is written to a staging folder
+first and then renamed into the output folder, so the server's /batch/next
+(which reads the first file it finds in server/batch_data) never sees a
+half-written file. Everything that is not converted JSONL (rejects sidecars,
+shard manifests, the status file and the staging folder) lives in a separate
+metadata folder, <output>_meta by default.
+
+The status file (<meta>/watch_status.json) reports backlog, throughput and
+per-file results, and doubles as the record of what has been converted so a
+restarted watcher does not redo work. Files whose conversion failed are
+retried with exponential backoff, and right away after a restart.
+
+Ctrl-C stops polling and lets running conversions finish; the pool workers
+ignore SIGINT so they are not killed halfway through a file.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import signal
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from pathlib import Path
+
+from convert_gemini_to_chatgpt import convert_file, default_meta_dir
+from shard_writer import positive_int_arg, size_arg
+
+# Names that indicate a download or copy still in progress
+IN_PROGRESS_SUFFIXES = (".tmp", ".part", ".partial", ".crdownload", ".download")
+
+# Seconds before a failed file is retried; doubles per failed attempt
+RETRY_BACKOFF = 30.0
+RETRY_BACKOFF_MAX = 3600.0
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _write_json_atomic(path, data):
+    tmp_path = path.parent / f".{path.name}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _ignore_sigint():
+    """Pool initializer: Ctrl-C goes to the watcher, which lets running conversions finish."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def convert_into_place(input_path, output_dir, meta_dir, options):
+    """
+    Convert one input file in a private staging folder, then rename the results
+    into place. Runs in a worker process.
+
+    Returns a dict with the converted/error counts and the output file names.
+    """
+    input_path = Path(input_path)
+    output_dir = Path(output_dir)
+    meta_dir = Path(meta_dir)
+    job_dir = meta_dir / "staging" / uuid.uuid4().hex
+    job_dir.mkdir(parents=True)
+    output_name = f"{input_path.stem}_chatgpt{input_path.suffix}"
+    rejects_name = f"{input_path.stem}_chatgpt_rejects{input_path.suffix}"
+    log = io.StringIO()
+    started = time.monotonic()
+    try:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            processed, errors, skipped = convert_file(
+                input_path,
+                job_dir / output_name,
+                rejects_path=job_dir / rejects_name,
+                meta_dir=job_dir,
+                **options,
+            )
+        outputs = []
+        # Converted JSONL (single file or shards) goes to the output folder;
+        # everything else (rejects, shard manifest) to the metadata folder
+        for staged in sorted(job_dir.iterdir()):
+            if staged.name == rejects_name or staged.suffix != input_path.suffix:
+                os.replace(staged, meta_dir / staged.name)
+            else:
+                os.replace(staged, output_dir / staged.name)
+                outputs.append(staged.name)
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
+    return {
+        "processed": processed,
+        "errors": errors,
+        "skipped": skipped,
+        "outputs": outputs,
+        "seconds": round(time.monotonic() - started, 3),
+    }
+
+
+class FolderWatcher:
+    """Polls input_dir and converts complete, new or changed JSONL files."""
+
+    def __init__(self, input_dir, output_dir, meta_dir, workers=2, stable_polls=2, convert_options=None):
+        self.input_dir = Path(input_dir)
+        self.output_dir = Path(output_dir)
+        self.meta_dir = Path(meta_dir)
+        self.workers = workers
+        self.stable_polls = stable_polls
+        self.convert_options = convert_options or {}
+        self.status_path = self.meta_dir / "watch_status.json"
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.meta_dir.mkdir(parents=True, exist_ok=True)
+        # Converted files are staged under meta_dir and renamed into output_dir,
+        # which only works within one filesystem
+        if os.stat(self.output_dir).st_dev != os.stat(self.meta_dir).st_dev:
+            raise ValueError(
+                f"Metadata folder {self.meta_dir} is on a different filesystem than the output folder "
+                f"{self.output_dir}; choose a --meta-dir on the same filesystem"
+            )
+        # Leftovers from a watcher that was killed mid-conversion
+        shutil.rmtree(self.meta_dir / "staging", ignore_errors=True)
+
+        self.files = {}
+        if self.status_path.exists():
+            with open(self.status_path, "r", encoding="utf-8") as f:
+                self.files = json.load(f).get("files", {})
+        self.started_at = _now_iso()
+        self.started = time.monotonic()
+        self.records_converted = 0
+        self.record_errors = 0
+        self.files_converted = 0
+        self.files_failed = 0
+        self.busy_seconds = 0.0
+        self._candidates = {}  # name -> [signature, polls seen unchanged]
+        self._running = {}  # name -> (future, signature)
+        self._retry_at = {}  # name -> time.monotonic() after which a failed file is retried
+
+    def _is_candidate(self, path):
+        name = path.name
+        return (
+            path.suffix == ".jsonl"
+            and not name.startswith(".")
+            and not name.endswith(IN_PROGRESS_SUFFIXES)
+            and path.is_file()
+        )
+
+    def _is_done(self, name, signature):
+        """True if the file at this signature needs no conversion (now)."""
+        entry = self.files.get(name)
+        if not entry or entry["signature"] != signature:
+            return False
+        if not entry.get("failed"):
+            return True
+        # Failed: wait out the backoff (nothing to wait for after a restart)
+        return time.monotonic() < self._retry_at.get(name, 0.0)
+
+    def _scan(self):
+        """Update stability counters; return names that are ready to convert."""
+        ready = []
+        seen = set()
+        for path in self.input_dir.iterdir():
+            if not self._is_candidate(path):
+                continue
+            name = path.name
+            seen.add(name)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signature = [stat.st_size, stat.st_mtime_ns]
+            if name in self._running or self._is_done(name, signature):
+                self._candidates.pop(name, None)
+                continue
+            candidate = self._candidates.get(name)
+            if candidate is None or candidate[0] != signature:
+                self._candidates[name] = [signature, 1]
+            else:
+                candidate[1] += 1
+            if self._candidates[name][1] >= self.stable_polls:
+                ready.append(name)
+        for name in list(self._candidates):
+            if name not in seen:
+                del self._candidates[name]
+        return ready
+
+    def _collect(self):
+        for name, (future, signature) in list(self._running.items()):
+            if not future.done():
+                continue
+            del self._running[name]
+            previous = self.files.get(name, {})
+            entry = {"signature": signature, "finished_at": _now_iso()}
+            try:
+                result = future.result()
+            except KeyboardInterrupt:
+                # Interrupted before the worker ignored SIGINT; not converted,
+                # so leave the previous entry and convert it on the next polls
+                print(f"Interrupted {name}; will retry", file=sys.stderr)
+                continue
+            except Exception as e:
+                retried = previous.get("failed") and previous.get("signature") == signature
+                attempts = previous.get("attempts", 0) + 1 if retried else 1
+                backoff = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** (attempts - 1))
+                entry.update({"failed": True, "error": f"{type(e).__name__}: {e}", "attempts": attempts,
+                              "outputs": previous.get("outputs", [])})
+                self._retry_at[name] = time.monotonic() + backoff
+                self.files_failed += 1
+                print(f"FAILED {name}: {entry['error']} (retrying in {backoff:.0f}s)", file=sys.stderr)
+            else:
+                self._retry_at.pop(name, None)
+                # Remove outputs of an earlier conversion that this one did not
+                # replace (e.g. fewer shards than before)
+                for stale in set(previous.get("outputs", [])) - set(result["outputs"]):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(self.output_dir / stale)
+                entry.update(result)
+                self.files_converted += 1
+                self.records_converted += result["processed"]
+                self.record_errors += result["errors"]
+                self.busy_seconds += result["seconds"]
+                print(f"Converted {name}: {result['processed']} record(s), "
+                      f"{result['errors']} error(s) in {result['seconds']}s")
+            self.files[name] = entry
+
+    def _write_status(self):
+        elapsed = time.monotonic() - self.started
+        _write_json_atomic(self.status_path, {
+            "updated_at": _now_iso(),
+            "started_at": self.started_at,
+            "input_dir": str(self.input_dir),
+            "output_dir": str(self.output_dir),
+            "backlog": len(self._candidates) + len(self._running),
+            "waiting_for_stable": sorted(self._candidates),
+            "running": sorted(self._running),
+            "files_converted": self.files_converted,
+            "files_failed": self.files_failed,
+            "records_converted": self.records_converted,
+            "record_errors": self.record_errors,
+            "records_per_second": round(self.records_converted / elapsed, 2) if elapsed else 0.0,
+            "records_per_busy_second": (
+                round(self.records_converted / self.busy_seconds, 2) if self.busy_seconds else 0.0
+            ),
+            "files": self.files,
+        })
+
+    def poll(self, pool):
+        """Run one poll cycle. Returns True while there is outstanding work."""
+        self._collect()
+        for name in self._scan():
+            if len(self._running) >= self.workers:
+                break
+            signature = self._candidates.pop(name)[0]
+            future = pool.submit(
+                convert_into_place,
+                str(self.input_dir / name),
+                str(self.output_dir),
+                str(self.meta_dir),
+                self.convert_options,
+            )
+            self._running[name] = (future, signature)
+            print(f"Queued {name}")
+        self._write_status()
+        return bool(self._candidates or self._running)
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_sigint)
+
+    def run(self, interval=5.0, once=False):
+        print(f"Watching {self.input_dir} -> {self.output_dir} "
+              f"(workers: {self.workers}, status: {self.status_path})")
+        pool = self._new_pool()
+        try:
+            while True:
+                try:
+                    busy = self.poll(pool)
+                except BrokenProcessPool:
+                    # A worker died (e.g. killed by the OOM killer). Its jobs are
+                    # recorded as failed and retried with backoff; start a new pool
+                    print("Worker pool died; starting a new one", file=sys.stderr)
+                    pool.shutdown(wait=False)
+                    pool = self._new_pool()
+                    busy = True
+                if once and not busy:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\nStopping; waiting for running conversions to finish (Ctrl-C again to abort)...")
+            pool.shutdown(wait=True)
+            self._collect()
+            self._write_status()
+        else:
+            pool.shutdown(wait=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Watch a folder and convert new Gemini batch results to ChatGPT format",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Convert downloads into the folder the server reads from
+  python watch_batch_folder.py downloads/ -o server/batch_data
+
+  # Convert whatever is complete right now, then exit
+  python watch_batch_folder.py downloads/ -o server/batch_data --once
+        """
+    )
+    parser.add_argument('input_dir', help='Folder that Gemini batch results are downloaded into')
+    parser.add_argument(
+        '-o', '--output',
+        dest='output_dir',
+        help='Folder for converted files. Default: <input>_chatgpt/'
+    )
+    parser.add_argument(
+        '--meta-dir',
+        help='Folder for status, rejects, shard manifests and staging; must be on the same filesystem as '
+             'the output folder. Default: <output>_meta/'
+    )
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls (default: 5)')
+    parser.add_argument(
+        '--stable-polls',
+        type=int,
+        default=2,
+        help='Polls a file must stay unchanged before it is converted (default: 2)'
+    )
+    parser.add_argument('--workers', type=int, default=2, help='Concurrent conversions (default: 2)')
+    parser.add_argument('--once', action='store_true', help='Exit once no complete file is left to convert')
+    parser.add_argument('--validate', action='store_true', help='Validate records against the Photo schema')
+    parser.add_argument('--coerce', action='store_true', help='Validate and coerce records (e.g. string -> [string])')
+    parser.add_argument('--shard-size', type=size_arg, help='Shard output at this size (e.g. 50MB)')
+    parser.add_argument('--shard-records', type=positive_int_arg, help='Shard output at this many records')
+    args = parser.parse_args(argv)
+
+    input_dir = Path(args.input_dir)
+    if not input_dir.is_dir():
+        print(f"FATAL ERROR: Input path is not a directory: {input_dir}", file=sys.stderr)
+        sys.exit(1)
+    output_dir = Path(args.output_dir) if args.output_dir else input_dir.parent / f"{input_dir.name}_chatgpt"
+    meta_dir = Path(args.meta_dir) if args.meta_dir else default_meta_dir(output_dir)
+
+    try:
+        watcher = FolderWatcher(
+            input_dir,
+            output_dir,
+            meta_dir,
+            workers=max(1, args.workers),
+            stable_polls=max(1, args.stable_polls),
+            convert_options={
+                "validate": args.validate,
+                "coerce": args.coerce,
+                "shard_size": args.shard_size,
+                "shard_records": args.shard_records,
+            },
+        )
+    except ValueError as e:
+        print(f"FATAL ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    watcher.run(interval=args.interval, once=args.once)
+
+
+if __name__ == "__main__":
+    main()